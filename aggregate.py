@@ -0,0 +1,302 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+
+from storage import load_table, save_table
+
+# ==========================================
+# 1. KONFIGURASI
+# ==========================================
+# Agregat sentimen per jam / hari, per akun yang dibalas (in_reply_to_screen_name) dan per keyword.
+# State berisi jumlah (bukan rata-rata), jadi batch tweet baru cukup ditambahkan ke sel yang ada
+# tanpa menghitung ulang seluruh riwayat; rasio & skor rata-rata dihitung saat query.
+#
+#   python aggregate.py build dataset_raw.csv                  # bangun ulang dari seluruh riwayat
+#   python aggregate.py query --granularity day --dimension keyword
+#   python aggregate.py query --granularity hour --rolling 24  # jumlah bergulir 24 jam terakhir
+#
+# Update inkremental dilakukan otomatis oleh incremental.py setelah scoring batch baru.
+
+AGGREGATE_FILE = "agregat_sentimen.parquet"
+
+# Bucket waktu dihitung di zona waktu lokal (hari = 00:00-24:00 WIB)
+TIMEZONE = "Asia/Jakarta"
+CREATED_AT_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+GRANULARITIES = {'hour': 'h', 'day': 'D'}
+
+# Bucket per jam lebih tua dari ini (dihitung dari bucket terbaru) dibuang; bucket harian disimpan semua
+HOURLY_RETENTION_DAYS = 30
+
+# Keyword dicocokkan per kata utuh di cleaned_text (huruf kecil, sebelum stemming)
+KEYWORDS = ['mbg', 'makan bergizi gratis', 'bgn', 'keracunan', 'sppg', 'prabowo']
+
+# Bobot engagement: 1 + log1p(like + 2 x retweet), supaya tweet viral lebih berat tanpa mendominasi
+ENGAGEMENT_WEIGHTS = {'favorite_count': 1.0, 'retweet_count': 2.0}
+
+# Kolom state: key sel + jumlah-jumlah yang bisa dijumlahkan antar batch
+KEY_COLUMNS = ['granularity', 'bucket', 'dimension', 'value']
+SUM_COLUMNS = [
+    'tweets', 'positif', 'netral', 'negatif', 'score_sum',
+    'weight_sum', 'weighted_positif', 'weighted_negatif', 'weighted_score_sum',
+    'favorite_sum', 'retweet_sum',
+]
+
+# Skema Parquet state (storage.save_table): jumlah tweet/label/engagement int64, jumlah bobot float64
+STATE_SCHEMA = {
+    'int': ['bucket'] + [col for col in SUM_COLUMNS if not col.startswith('weight')],
+    'float': [col for col in SUM_COLUMNS if col.startswith('weight')],
+    'dictionary': ['granularity', 'dimension'],
+}
+
+_EPOCH = pd.Timestamp(0, tz='UTC')
+
+# ==========================================
+# 2. KEYWORD & BOBOT
+# ==========================================
+
+def keyword_pattern(keywords):
+    # Frasa terpanjang dicoba dulu supaya 'makan bergizi gratis' tidak terpotong keyword yang lebih pendek
+    ordered = sorted(keywords, key=len, reverse=True)
+    return re.compile(r'\b(?:' + "|".join(re.escape(k) for k in ordered) + r')\b')
+
+def match_keywords(texts, pattern):
+    """List keyword unik yang muncul di tiap teks"""
+    return [sorted(set(pattern.findall(text))) if isinstance(text, str) else [] for text in texts]
+
+def engagement_counts(df, col):
+    """Kolom hitungan engagement sebagai int64 (kolom tidak ada / kosong -> 0)"""
+    if col not in df.columns: return np.zeros(len(df), dtype=np.int64)
+    return pd.to_numeric(df[col], errors='coerce').fillna(0).clip(lower=0).astype(np.int64).to_numpy()
+
+def engagement_weight(df):
+    total = sum(weight * engagement_counts(df, col) for col, weight in ENGAGEMENT_WEIGHTS.items())
+    return 1 + np.log1p(total)
+
+def to_buckets(created_at, freq, timezone=TIMEZONE):
+    """Awal bucket (detik epoch UTC) untuk tiap created_at"""
+    local = created_at.dt.tz_convert(timezone).dt.floor(freq)
+    return ((local - _EPOCH) // pd.Timedelta(seconds=1)).astype('int64')
+
+# ==========================================
+# 3. AGREGATOR
+# ==========================================
+
+class SentimentAggregator:
+    """
+    State agregat: dict (granularity, bucket, dimension, value) -> array jumlah (urutan SUM_COLUMNS).
+    Dimensi: 'all' (value ''), 'reply_to' (akun yang dibalas), 'keyword'.
+    """
+
+    def __init__(self, path=AGGREGATE_FILE, keywords=KEYWORDS, timezone=TIMEZONE,
+                 hourly_retention_days=HOURLY_RETENTION_DAYS):
+        self.path = path
+        self.keywords = keywords
+        self.pattern = keyword_pattern(keywords)
+        self.timezone = timezone
+        self.hourly_retention_days = hourly_retention_days
+        self.cells = {}
+        if path and os.path.exists(path): self.load(path)
+
+    def rows_to_sums(self, df, label_col='label_pred', score_col='score', text_col='cleaned_text'):
+        """Satu baris per (tweet, dimensi): kolom key + SUM_COLUMNS, belum digabung"""
+        created_at = pd.to_datetime(df['created_at'], format=CREATED_AT_FORMAT, errors='coerce', utc=True)
+        valid = created_at.notna().to_numpy()
+        df, created_at = df[valid], created_at[valid]
+
+        label = df[label_col].astype(str).to_numpy()
+        score = pd.to_numeric(df[score_col], errors='coerce').fillna(0).to_numpy() if score_col in df.columns \
+            else np.select([label == 'Positif', label == 'Negatif'], [1, -1], 0)
+        weight = engagement_weight(df)
+        is_pos, is_neg = label == 'Positif', label == 'Negatif'
+        sums = pd.DataFrame({
+            'tweets': 1,
+            'positif': is_pos.astype(np.int64),
+            'netral': (label == 'Netral').astype(np.int64),
+            'negatif': is_neg.astype(np.int64),
+            'score_sum': score.astype(np.int64),
+            'weight_sum': weight,
+            'weighted_positif': weight * is_pos,
+            'weighted_negatif': weight * is_neg,
+            'weighted_score_sum': weight * score,
+            'favorite_sum': engagement_counts(df, 'favorite_count'),
+            'retweet_sum': engagement_counts(df, 'retweet_count'),
+        }, index=df.index)
+
+        # Dimensi per tweet: selalu 'all', akun yang dibalas (kalau ada), lalu tiap keyword yang cocok
+        dims = [sums.assign(dimension='all', value='')]
+        if 'in_reply_to_screen_name' in df.columns:
+            reply_to = df['in_reply_to_screen_name']
+            has_reply = reply_to.notna() & (reply_to.astype(str) != '')
+            dims.append(sums[has_reply].assign(dimension='reply_to', value=reply_to[has_reply].astype(str)))
+        if text_col in df.columns:
+            keywords = pd.Series(match_keywords(df[text_col], self.pattern), index=df.index).explode().dropna()
+            dims.append(sums.loc[keywords.index].assign(dimension='keyword', value=keywords.to_numpy()))
+        long = pd.concat(dims)
+
+        frames = []
+        for granularity, freq in GRANULARITIES.items():
+            buckets = to_buckets(created_at, freq, self.timezone)
+            frames.append(long.assign(granularity=granularity, bucket=buckets.loc[long.index].to_numpy()))
+        return pd.concat(frames, ignore_index=True), int((~valid).sum())
+
+    def update(self, df, label_col='label_pred', score_col='score', text_col='cleaned_text'):
+        """
+        Tambahkan tweet yang sudah di-scoring (kolom created_at, label, skor, engagement, teks).
+        Hanya batch ini yang di-groupby; sel lama cukup dijumlahkan.
+        Mengembalikan jumlah baris yang dilewati karena created_at tidak valid.
+        """
+        if df.empty: return 0
+        long, skipped = self.rows_to_sums(df, label_col, score_col, text_col)
+        if long.empty: return skipped
+        grouped = long.groupby(KEY_COLUMNS, sort=False)[SUM_COLUMNS].sum()
+        values = grouped.to_numpy(dtype=np.float64)
+        for key, row in zip(grouped.index, values):
+            cell = self.cells.get(key)
+            if cell is None:
+                self.cells[key] = row.copy()
+            else:
+                cell += row
+        return skipped
+
+    def prune(self):
+        """Buang bucket per jam di luar jendela retensi"""
+        hourly = [key[1] for key in self.cells if key[0] == 'hour']
+        if not hourly or not self.hourly_retention_days: return 0
+        cutoff = max(hourly) - self.hourly_retention_days * 86400
+        stale = [key for key in self.cells if key[0] == 'hour' and key[1] < cutoff]
+        for key in stale: del self.cells[key]
+        return len(stale)
+
+    # --- State di disk ---
+
+    def to_frame(self):
+        if not self.cells:
+            return pd.DataFrame(columns=KEY_COLUMNS + SUM_COLUMNS)
+        keys = pd.DataFrame(list(self.cells.keys()), columns=KEY_COLUMNS)
+        sums = pd.DataFrame(np.vstack(list(self.cells.values())), columns=SUM_COLUMNS)
+        df = pd.concat([keys, sums], axis=1)
+        for col in SUM_COLUMNS:
+            if not col.startswith('weight'): df[col] = df[col].round().astype('int64')
+        return df.sort_values(KEY_COLUMNS, ignore_index=True)
+
+    def load(self, path):
+        df = load_table(path)
+        values = df[SUM_COLUMNS].to_numpy(dtype=np.float64)
+        keys = zip(df['granularity'].astype(str), df['bucket'].astype('int64'),
+                   df['dimension'].astype(str), df['value'].fillna('').astype(str))
+        self.cells = {key: row for key, row in zip(keys, values)}
+        return len(self.cells)
+
+    def save(self, path=None):
+        """Tulis atomik (file sementara lalu os.replace) supaya dashboard tidak membaca file setengah jadi"""
+        path = path or self.path
+        self.prune()
+        root, ext = os.path.splitext(path)
+        tmp_path = f"{root}.tmp{ext}"
+        save_table(self.to_frame(), tmp_path, schema=STATE_SCHEMA)
+        os.replace(tmp_path, path)
+        return path
+
+# ==========================================
+# 4. QUERY
+# ==========================================
+
+def derive(df):
+    """Kolom turunan dari jumlah: rasio label, skor rata-rata, skor tertimbang engagement"""
+    tweets = df['tweets'].where(df['tweets'] > 0)
+    weight = df['weight_sum'].where(df['weight_sum'] > 0)
+    return df.assign(
+        positif_ratio=df['positif'] / tweets,
+        negatif_ratio=df['negatif'] / tweets,
+        net_sentiment=(df['positif'] - df['negatif']) / tweets,
+        mean_score=df['score_sum'] / tweets,
+        weighted_net_sentiment=(df['weighted_positif'] - df['weighted_negatif']) / weight,
+        weighted_score=df['weighted_score_sum'] / weight,
+    )
+
+def query(state, granularity='day', dimension='all', value=None, since=None, until=None,
+          rolling=None, timezone=TIMEZONE):
+    """
+    Deret waktu agregat dari state (SentimentAggregator atau DataFrame hasil load_table).
+    rolling=N -> jumlah bergulir N bucket (bucket kosong dihitung 0) sebelum rasio dihitung.
+    """
+    df = state.to_frame() if isinstance(state, SentimentAggregator) else state
+    df = df[(df['granularity'] == granularity) & (df['dimension'] == dimension)]
+    if value is not None: df = df[df['value'] == value]
+    df = df.assign(time=pd.to_datetime(df['bucket'].astype('int64'), unit='s', utc=True).dt.tz_convert(timezone))
+    df = df[['time', 'value'] + SUM_COLUMNS]
+
+    if rolling:
+        freq = GRANULARITIES[granularity]
+        series = []
+        for val, group in df.groupby('value', sort=True):
+            full = pd.date_range(group['time'].min(), group['time'].max(), freq=freq)
+            group = group.set_index('time')[SUM_COLUMNS].reindex(full, fill_value=0)
+            group = group.rolling(rolling, min_periods=1).sum()
+            series.append(group.rename_axis('time').reset_index().assign(value=val))
+        if series:
+            df = pd.concat(series, ignore_index=True)[['time', 'value'] + SUM_COLUMNS]
+            counts = [col for col in SUM_COLUMNS if not col.startswith('weight')]
+            df[counts] = df[counts].round().astype('int64')
+
+    if since is not None: df = df[df['time'] >= pd.Timestamp(since, tz=timezone)]
+    if until is not None: df = df[df['time'] < pd.Timestamp(until, tz=timezone)]
+    return derive(df.sort_values(['value', 'time'], ignore_index=True))
+
+def build(input_file, path=AGGREGATE_FILE, text_col='full_text'):
+    """
+    Bangun state dari nol: preprocess + scoring seluruh file raw, lalu agregasi.
+    Dedupe sama dengan incremental.py (tweet_key, lalu cleaned_text kosong / persis sama dibuang),
+    supaya hasil build sama dengan state hasil update inkremental dari data yang sama.
+    """
+    from feature_selection import clean_text
+    from tweet_key import tweet_key
+    import preprocess
+    import sentimen
+
+    df = load_table(input_file)
+    total = len(df)
+    keys = pd.Series([tweet_key(row) for row in df.to_dict('records')], index=df.index)
+    df = df[~keys.duplicated(keep='first')].copy()
+    df['cleaned_text'] = df[text_col].apply(clean_text)
+    df = df[df['cleaned_text'] != ''].drop_duplicates(subset=['cleaned_text'], keep='first')
+    print(f"🧹 {len(df)} tweet setelah dedupe ({total - len(df)} dibuang)")
+    preprocess.stem_cache.load(preprocess.STEM_CACHE_FILE)
+    processed = [preprocess.preprocess_text(text) for text in df['cleaned_text']]
+    preprocess.stem_cache.save(preprocess.STEM_CACHE_FILE)
+    scores = sentimen.score_batch(processed)
+    df['label_pred'], df['score'] = scores['label'], scores['score']
+
+    aggregator = SentimentAggregator(path=None)
+    skipped = aggregator.update(df)
+    aggregator.save(path)
+    print(f"💾 {len(df) - skipped} tweet diagregasi ({skipped} created_at tidak valid), "
+          f"{len(aggregator.cells)} sel disimpan di: {path}")
+    return aggregator
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Agregasi sentimen per jam/hari, akun yang dibalas & keyword")
+    parser.add_argument('--state', default=AGGREGATE_FILE, help="File state agregat (.parquet / .csv)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help="Bangun ulang state dari file raw")
+    build_parser.add_argument('input_file', help="CSV/Parquet format dataset_raw.csv")
+
+    query_parser = commands.add_parser('query', help="Tampilkan deret waktu agregat")
+    query_parser.add_argument('--granularity', choices=list(GRANULARITIES), default='day')
+    query_parser.add_argument('--dimension', choices=['all', 'reply_to', 'keyword'], default='all')
+    query_parser.add_argument('--value', default=None)
+    query_parser.add_argument('--since', default=None)
+    query_parser.add_argument('--until', default=None)
+    query_parser.add_argument('--rolling', type=int, default=None, help="Jumlah bergulir N bucket")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build(args.input_file, args.state)
+    else:
+        result = query(load_table(args.state), args.granularity, args.dimension, args.value,
+                       args.since, args.until, args.rolling)
+        columns = ['time', 'value', 'tweets', 'positif', 'netral', 'negatif', 'net_sentiment', 'weighted_net_sentiment']
+        print(result[columns].to_string(index=False))
@@ -0,0 +1,263 @@
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 1. KONFIGURASI
+# ==========================================
+# Contoh:
+#   python benchmark.py                              # 10k, 100k, 1M baris
+#   python benchmark.py --sizes 10000 --output bench_baru.json --compare bench_lama.json
+
+SOURCE_FILE = "dataset_raw.csv"
+SIZES = [10_000, 100_000, 1_000_000]
+SEED = 42
+RESULTS_DIR = "benchmarks"
+
+# Alokasi (tracemalloc) diukur di sampel terpisah karena tracemalloc memperlambat 5-10x
+ALLOC_SAMPLE = 10_000
+
+# Kolom sama dengan dataset_raw.csv hasil tweet-harvest
+RAW_COLUMNS = [
+    'conversation_id_str', 'created_at', 'favorite_count', 'full_text', 'id_str', 'image_url',
+    'in_reply_to_screen_name', 'lang', 'location', 'quote_count', 'reply_count', 'retweet_count',
+    'tweet_url', 'user_id_str', 'username',
+]
+
+# ==========================================
+# 2. KORPUS SINTETIS
+# ==========================================
+
+def make_corpus(n_rows, source_file=SOURCE_FILE, seed=SEED):
+    """
+    Korpus tweet sintetis berbentuk dataset_raw.csv: token diambil dari tweet asli sesuai
+    frekuensinya (mention, hashtag, URL, angka & slang ikut terbawa), panjang tweet mengikuti
+    sebaran panjang tweet asli. Seed sama -> korpus sama, jadi hasil antar run bisa dibandingkan.
+    """
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(source_file, usecols=['full_text', 'in_reply_to_screen_name'], dtype=str)
+    tweets = [str(text).split() for text in source['full_text'].dropna()]
+
+    vocab, counts = np.unique(np.concatenate([np.array(words, dtype=object) for words in tweets if words]),
+                              return_counts=True)
+    lengths = rng.choice(np.array([len(words) for words in tweets if words]), size=n_rows)
+    token_idx = rng.choice(len(vocab), size=int(lengths.sum()), p=counts / counts.sum())
+    tokens = vocab[token_idx].tolist()
+
+    texts = []
+    pos = 0
+    for length in lengths.tolist():
+        texts.append(" ".join(tokens[pos:pos + length]))
+        pos += length
+
+    ids = rng.integers(10 ** 18, 2 * 10 ** 18, size=n_rows, dtype=np.int64).astype(str)
+    user_ids = rng.integers(10 ** 8, 2 * 10 ** 18, size=n_rows, dtype=np.int64).astype(str)
+    created = pd.Timestamp('2025-11-01', tz='UTC') + pd.to_timedelta(rng.integers(0, 30 * 86400, size=n_rows), unit='s')
+    reply_to = source['in_reply_to_screen_name'].dropna().to_numpy()
+    has_image = rng.random(n_rows) < 0.2
+
+    return pd.DataFrame({
+        'conversation_id_str': ids,
+        'created_at': created.strftime('%a %b %d %H:%M:%S +0000 %Y'),
+        'favorite_count': rng.geometric(0.3, size=n_rows) - 1,
+        'full_text': texts,
+        'id_str': ids,
+        'image_url': np.where(has_image, 'https://pbs.twimg.com/media/' + pd.Series(ids).str[-8:] + '.jpg', None),
+        'in_reply_to_screen_name': rng.choice(reply_to, size=n_rows) if len(reply_to) else None,
+        'lang': 'in',
+        'location': None,
+        'quote_count': rng.geometric(0.8, size=n_rows) - 1,
+        'reply_count': rng.geometric(0.6, size=n_rows) - 1,
+        'retweet_count': rng.geometric(0.5, size=n_rows) - 1,
+        'tweet_url': 'https://x.com/undefined/status/' + pd.Series(ids),
+        'user_id_str': user_ids,
+        'username': None,
+    }, columns=RAW_COLUMNS)
+
+# ==========================================
+# 3. PENGUKURAN
+# ==========================================
+
+def current_rss_mb():
+    """RSS proses saat ini (Linux /proc), None kalau tidak tersedia"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def peak_rss_mb():
+    """Puncak RSS proses sejauh ini (ru_maxrss: KB di Linux, byte di macOS)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def measure_allocations(func, sample):
+    """Puncak memori Python yang dialokasikan & jumlah blok yang tersisa, diukur dengan tracemalloc"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = func(sample)
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    del result
+    return {'alloc_sample_rows': len(sample), 'alloc_peak_mb': peak / 1024 ** 2, 'alloc_blocks': blocks}
+
+def run_stage(name, func, data, rows, alloc=True):
+    """Jalankan satu tahap: waktu, rows/s, RSS, lalu (opsional) alokasi di sampel"""
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    result = func(data)
+    elapsed = time.perf_counter() - start
+    rss_after = current_rss_mb()
+
+    stats = {
+        'stage': name,
+        'rows': rows,
+        'seconds': elapsed,
+        'rows_per_s': rows / elapsed if elapsed > 0 else None,
+        'rss_delta_mb': rss_after - rss_before if rss_before is not None else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    if alloc and isinstance(data, list):
+        stats.update(measure_allocations(func, data[:ALLOC_SAMPLE]))
+    print(f"   {name:<18} {elapsed:9.3f} s  {stats['rows_per_s'] or 0:12,.0f} baris/s")
+    return result, stats
+
+# ==========================================
+# 4. BENCHMARK PER TAHAP
+# ==========================================
+
+def bench_size(n_rows, workdir, source_file=SOURCE_FILE, seed=SEED):
+    """Semua tahap pipeline pada korpus n_rows baris, masing-masing memakai output tahap sebelumnya"""
+    from feature_selection import clean_text
+    import preprocess
+    import sentimen
+
+    print(f"\n📏 Korpus {n_rows:,} baris")
+    corpus, gen_stats = run_stage('make_corpus', lambda n: make_corpus(n, source_file, seed), n_rows, n_rows)
+    stages = [gen_stats]
+
+    path = os.path.join(workdir, f"bench_{n_rows}.csv")
+    _, stats = run_stage('csv_write', lambda df: df.to_csv(path, index=False, encoding='utf-8'), corpus, n_rows)
+    stages.append(dict(stats, bytes=os.path.getsize(path)))
+    corpus, stats = run_stage('csv_read', lambda p: pd.read_csv(p, dtype=str), path, n_rows)
+    stages.append(stats)
+    os.remove(path)
+
+    # Setup sekali (stopword, stemmer, lexicon) tidak ikut dihitung sebagai waktu per baris
+    preprocess.get_stopwords()
+    preprocess.get_stemmer()
+    sentimen.get_lexicon()
+
+    data = corpus['full_text'].tolist()
+    del corpus
+    stem_before = preprocess.stem_cache.stats()
+    pipeline = [
+        ('clean_text', clean_text),
+        ('clean_regex', preprocess.clean_regex),
+        ('normalize_slang', preprocess.normalize_slang),
+        ('remove_stopwords', preprocess.remove_stopwords),
+        ('stemming_text', preprocess.stemming_text),
+    ]
+    for name, func in pipeline:
+        data, stats = run_stage(name, lambda texts, func=func: [func(text) for text in texts], data, n_rows)
+        stages.append(stats)
+        if name == 'clean_text':
+            cleaned = data
+
+    # Hit rate cache stem khusus run ini (cache tetap hangat dari ukuran sebelumnya)
+    stem_after = preprocess.stem_cache.stats()
+    hits = stem_after['hits'] - stem_before['hits']
+    misses = stem_after['misses'] - stem_before['misses']
+    stages[-1]['cache_hit_rate'] = hits / (hits + misses) if hits + misses else 0.0
+
+    _, stats = run_stage('normalize_fused', lambda texts: [preprocess.normalize_fused(t) for t in texts], cleaned, n_rows)
+    stages.append(stats)
+    _, stats = run_stage('get_sentiment', lambda texts: [sentimen.get_sentiment(t) for t in texts], data, n_rows)
+    stages.append(stats)
+    _, stats = run_stage('score_batch', sentimen.score_batch, data, n_rows)
+    stages.append(stats)
+
+    return {'rows': n_rows, 'stages': stages}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(sizes=SIZES, source_file=SOURCE_FILE, seed=SEED, workdir=RESULTS_DIR, stem_cache_file=None):
+    os.makedirs(workdir, exist_ok=True)
+    # Tanpa cache stem, ukuran pertama menanggung stemming Sastrawi untuk semua kata unik (cold)
+    preloaded = 0
+    if stem_cache_file:
+        import preprocess
+        preloaded = preprocess.stem_cache.load(stem_cache_file)
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'source_file': source_file,
+        'stem_cache_preloaded': preloaded,
+        'results': [bench_size(n, workdir, source_file, seed) for n in sizes],
+    }
+
+# ==========================================
+# 5. PERBANDINGAN ANTAR RUN
+# ==========================================
+
+def compare(old, new):
+    """Cetak rasio rows/s baru vs lama per (ukuran, tahap); < 1 berarti lebih lambat"""
+    old_stats = {(r['rows'], s['stage']): s for r in old['results'] for s in r['stages']}
+    print(f"\n📊 Perbandingan {old.get('commit')} -> {new.get('commit')} (rasio rows/s, >1 = lebih cepat)")
+    regressions = []
+    for result in new['results']:
+        for stage in result['stages']:
+            before = old_stats.get((result['rows'], stage['stage']))
+            if not before or not before['rows_per_s'] or not stage['rows_per_s']: continue
+            ratio = stage['rows_per_s'] / before['rows_per_s']
+            flag = " ⚠️" if ratio < 0.9 else ""
+            print(f"   {result['rows']:>9,} {stage['stage']:<18} {ratio:6.2f}x{flag}")
+            if ratio < 0.9: regressions.append((result['rows'], stage['stage'], ratio))
+    return regressions
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark per tahap pipeline dengan korpus sintetis")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--source', default=SOURCE_FILE, help="CSV asli untuk sebaran token & panjang tweet")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--output', default=None, help="File JSON hasil (default benchmarks/bench_<waktu>.json)")
+    parser.add_argument('--compare', default=None, help="JSON run sebelumnya untuk dibandingkan")
+    parser.add_argument('--stem-cache', default=None, help="Muat cache stem (mis. stem_cache.json) sebelum mulai")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.sizes, args.source, args.seed, stem_cache_file=args.stem_cache)
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Hasil disimpan di: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
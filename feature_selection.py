@@ -1,5 +1,20 @@
 import pandas as pd
 import string
+import hashlib
+from contextlib import nullcontext
+from storage import load_table, iter_table, save_table, TableWriter
+from metrics import metrics
+from minhash import NearDuplicateIndex
+
+# Ukuran potongan (baris) untuk mode streaming
+STREAM_CHUNKSIZE = 50_000
+
+# Near-duplicate (MinHash/LSH): teks dengan estimasi Jaccard >= threshold ke teks sebelumnya dibuang
+NEAR_DUP_THRESHOLD = 0.8
+# Baris yang dibuang + cluster id (= nomor baris representatifnya di file output) untuk audit
+NEAR_DUP_AUDIT_FILE = "near_duplicates_audit.csv"
+# Kolom id yang ikut ditulis ke file audit bila ada
+AUDIT_ID_COLUMNS = ['id_str', 'tweet_url']
 
 def clean_text(text):
     """
@@ -21,35 +36,118 @@ def clean_text(text):
     
     return text
 
-def preprocess_data(input_file, output_file):
+def text_digest(text):
+    """
+    Hash ringkas (16 byte) dari cleaned_text untuk dedupe lintas chunk.
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def drop_near_duplicates(df, index, audit_writer=None):
     """
-    Fungsi utama untuk preprocessing data
+    Buang near-duplicate dari df (urutan dipertahankan, representatif = kemunculan pertama).
+    Baris yang dibuang ditulis ke audit_writer beserta cluster id & estimasi Jaccard.
     """
+    cluster_ids, is_rep, similarity = index.add(df['cleaned_text'].tolist())
+    if audit_writer is not None and not is_rep.all():
+        dropped = df.loc[~is_rep, [col for col in AUDIT_ID_COLUMNS if col in df.columns] + ['cleaned_text']].copy()
+        dropped.insert(0, 'similarity', similarity[~is_rep].round(4))
+        dropped.insert(0, 'cluster_id', cluster_ids[~is_rep])
+        audit_writer.write(dropped)
+    return df[is_rep].copy(), int((~is_rep).sum())
+
+def print_summary(initial_total, final_total, empty_removed, duplicates_removed,
+                  avg_length, avg_words, image_count, near_duplicates_removed=None):
+    """
+    Cetak statistik akhir preprocessing
+    """
+    print("\n" + "="*50)
+    print("📊 STATISTIK PREPROCESSING")
+    print("="*50)
+    print(f"Total tweets awal        : {initial_total}")
+    print(f"Total tweets akhir       : {final_total}")
+    print(f"Tweets dihapus (kosong)  : {empty_removed}")
+    print(f"Tweets dihapus (duplikat): {duplicates_removed}")
+    if near_duplicates_removed is not None:
+        print(f"Tweets dihapus (mirip)   : {near_duplicates_removed}")
+    print(f"Total tweets dihapus     : {initial_total - final_total}")
+    print("="*50)
+    
+    print(f"Rata-rata panjang teks   : {avg_length:.2f} karakter")
+    print(f"Rata-rata jumlah kata    : {avg_words:.2f} kata")
+    
+    if image_count is not None:
+        print(f"Tweets dengan gambar     : {image_count}")
+        print(f"Tweets tanpa gambar      : {final_total - image_count}")
+    print("="*50)
+
+def print_samples(df):
+    """
+    Tampilkan contoh original vs cleaned
+    """
+    print("\n📝 SAMPLE DATA (5 tweets pertama):")
+    print("-"*50)
+    for idx, row in df.head(5).iterrows():
+        print(f"\nTweet #{idx+1}")
+        # Mengambil 80 karakter pertama untuk preview
+        orig_text = str(row['full_text'])[:80] if 'full_text' in row else "N/A"
+        clean_txt = str(row['cleaned_text'])[:80]
+        
+        print(f"Original : {orig_text}...")
+        print(f"Cleaned  : {clean_txt}...")
+        print(f"Words    : {row['word_count']}")
+
+def preprocess_data(input_file, output_file, chunksize=None, near_dup_threshold=None,
+                    audit_file=NEAR_DUP_AUDIT_FILE):
+    """
+    Fungsi utama untuk preprocessing data.
+    Jika chunksize diisi, data diproses secara streaming (lihat preprocess_data_streaming).
+    Jika near_dup_threshold diisi (mis. NEAR_DUP_THRESHOLD), near-duplicate ikut dibuang.
+    """
+    if chunksize:
+        return preprocess_data_streaming(input_file, output_file, chunksize, near_dup_threshold, audit_file)
+    
     print("🔄 Memuat data...")
     # Load data
-    df = pd.read_csv(input_file)
+    # CSV atau Parquet (lihat storage.py), dipilih dari ekstensi file
+    with metrics.stage('load') as stage:
+        df = load_table(input_file)
+        stage.add_rows(len(df))
     
     # Simpan jumlah awal untuk statistik
     initial_total = len(df)
+    metrics.count('rows_in', initial_total)
     print(f"📊 Total data awal: {initial_total} tweets")
     
     # Apply text cleaning
     print("🧹 Membersihkan teks (Basic: Lowercase & Spasi)...")
-    df['cleaned_text'] = df['full_text'].apply(clean_text)
+    with metrics.stage('clean_text', rows=len(df)):
+        df['cleaned_text'] = df['full_text'].apply(clean_text)
     
     # Remove empty texts after cleaning
     df = df[df['cleaned_text'].str.len() > 0].copy()
+    metrics.dropped('empty', initial_total - len(df))
     
     # --- HAPUS DUPLIKAT ---
     print("🔍 Menghapus duplikasi berdasarkan 'cleaned_text'...")
     count_before_dedupe = len(df)
     
     # Hapus duplikat
-    df.drop_duplicates(subset=['cleaned_text'], keep='first', inplace=True)
+    with metrics.stage('dedupe', rows=count_before_dedupe):
+        df.drop_duplicates(subset=['cleaned_text'], keep='first', inplace=True)
     
     duplicates_removed = count_before_dedupe - len(df)
+    metrics.dropped('duplicate', duplicates_removed)
     print(f"🗑️ Duplikasi dihapus: {duplicates_removed} tweets")
     
+    # --- HAPUS NEAR-DUPLICATE (MinHash/LSH) ---
+    near_duplicates_removed = None
+    if near_dup_threshold:
+        print(f"🔍 Menghapus near-duplicate (MinHash/LSH, Jaccard >= {near_dup_threshold})...")
+        with metrics.stage('near_dedupe', rows=len(df)), TableWriter(audit_file) as audit_writer:
+            df, near_duplicates_removed = drop_near_duplicates(df, NearDuplicateIndex(near_dup_threshold), audit_writer)
+        metrics.dropped('near_duplicate', near_duplicates_removed)
+        print(f"🗑️ Near-duplicate dihapus: {near_duplicates_removed} tweets (audit: {audit_file})")
+    
     print(f"✅ Data setelah cleaning & dedupe: {len(df)} tweets")
     
     # Add text statistics
@@ -63,9 +161,9 @@ def preprocess_data(input_file, output_file):
     else:
         df['has_image'] = 0
     
-    # Convert engagement metrics to numeric
+    # Convert engagement metrics to numeric (Parquet sudah bertipe int, tidak perlu dikonversi ulang)
     for col in ['favorite_count', 'retweet_count', 'reply_count']:
-        if col in df.columns:
+        if col in df.columns and not pd.api.types.is_integer_dtype(df[col]):
             df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
     
     # Select relevant columns for output
@@ -78,41 +176,122 @@ def preprocess_data(input_file, output_file):
     
     # Save to CSV
     print(f"💾 Menyimpan hasil ke {output_file}...")
-    df_output.to_csv(output_file, index=False, encoding='utf-8')
+    with metrics.stage('save', rows=len(df_output)):
+        save_table(df_output, output_file)
+    metrics.count('rows_out', len(df_output))
     
     # Print statistics
-    print("\n" + "="*50)
-    print("📊 STATISTIK PREPROCESSING")
-    print("="*50)
-    print(f"Total tweets awal        : {initial_total}")
-    print(f"Total tweets akhir       : {len(df_output)}")
-    print(f"Tweets dihapus (kosong)  : {initial_total - count_before_dedupe}")
-    print(f"Tweets dihapus (duplikat): {duplicates_removed}")
-    print(f"Total tweets dihapus     : {initial_total - len(df_output)}")
-    print("="*50)
-    
     # Menggunakan df (bukan df_output) karena kolom statistik ada di df
-    print(f"Rata-rata panjang teks   : {df['text_length'].mean():.2f} karakter")
-    print(f"Rata-rata jumlah kata    : {df['word_count'].mean():.2f} kata")
-    
-    if 'has_image' in df.columns:
-        print(f"Tweets dengan gambar     : {df['has_image'].sum()}")
-        print(f"Tweets tanpa gambar      : {len(df) - df['has_image'].sum()}")
-    print("="*50)
+    print_summary(
+        initial_total, len(df_output),
+        initial_total - count_before_dedupe, duplicates_removed,
+        df['text_length'].mean(), df['word_count'].mean(),
+        df['has_image'].sum() if 'has_image' in df.columns else None,
+        near_duplicates_removed,
+    )
     
     # Show sample
-    print("\n📝 SAMPLE DATA (5 tweets pertama):")
-    print("-"*50)
     # Tampilkan sample dari df agar bisa membandingkan original vs cleaned
-    for idx, row in df.head(5).iterrows():
-        print(f"\nTweet #{idx+1}")
-        # Mengambil 80 karakter pertama untuk preview
-        orig_text = str(row['full_text'])[:80] if 'full_text' in row else "N/A"
-        clean_txt = str(row['cleaned_text'])[:80]
-        
-        print(f"Original : {orig_text}...")
-        print(f"Cleaned  : {clean_txt}...")
-        print(f"Words    : {row['word_count']}")
+    print_samples(df)
+    
+    print(f"\n✅ Preprocessing selesai! File disimpan di: {output_file}")
+
+def preprocess_data_streaming(input_file, output_file, chunksize=STREAM_CHUNKSIZE, near_dup_threshold=None,
+                              audit_file=NEAR_DUP_AUDIT_FILE):
+    """
+    Preprocessing per potongan (chunk) agar memori tetap datar berapapun ukuran file.
+    - Tiap chunk dibersihkan lalu langsung ditulis (append) ke output
+    - Dedupe tetap exact lintas chunk memakai set hash cleaned_text
+    - Near-duplicate (opsional) memakai satu index LSH untuk semua chunk
+    - Statistik dihitung sekali jalan (running aggregate), bukan dari DataFrame penuh
+    """
+    print(f"🔄 Memuat data secara streaming ({chunksize} baris per chunk)...")
+    
+    seen_digests = set()
+    initial_total = 0
+    empty_removed = 0
+    duplicates_removed = 0
+    final_total = 0
+    total_length = 0
+    total_words = 0
+    image_count = 0
+    samples = []
+    
+    near_index = NearDuplicateIndex(near_dup_threshold) if near_dup_threshold else None
+    near_duplicates_removed = 0 if near_dup_threshold else None
+    
+    output_columns = ['cleaned_text']
+    
+    with TableWriter(output_file) as writer, (TableWriter(audit_file) if near_index else nullcontext()) as audit_writer:
+        for chunk_no, chunk in enumerate(iter_table(input_file, chunksize)):
+            initial_total += len(chunk)
+            metrics.count('rows_in', len(chunk))
+            
+            with metrics.stage('clean_text', rows=len(chunk)):
+                chunk['cleaned_text'] = chunk['full_text'].apply(clean_text)
+            
+            # Remove empty texts after cleaning
+            non_empty = chunk['cleaned_text'].str.len() > 0
+            empty_removed += int((~non_empty).sum())
+            metrics.dropped('empty', int((~non_empty).sum()))
+            chunk = chunk[non_empty]
+            
+            # Dedupe lintas chunk: simpan digest, bukan teks penuh
+            with metrics.stage('dedupe', rows=len(chunk)):
+                keep = []
+                for text in chunk['cleaned_text']:
+                    digest = text_digest(text)
+                    if digest in seen_digests:
+                        keep.append(False)
+                    else:
+                        seen_digests.add(digest)
+                        keep.append(True)
+                keep = pd.Series(keep, index=chunk.index, dtype=bool)
+            duplicates_removed += int((~keep).sum())
+            metrics.dropped('duplicate', int((~keep).sum()))
+            chunk = chunk[keep].copy()
+            
+            if near_index is not None:
+                with metrics.stage('near_dedupe', rows=len(chunk)):
+                    chunk, removed = drop_near_duplicates(chunk, near_index, audit_writer)
+                near_duplicates_removed += removed
+                metrics.dropped('near_duplicate', removed)
+            
+            # Running aggregate untuk statistik
+            chunk['text_length'] = chunk['cleaned_text'].str.len()
+            chunk['word_count'] = chunk['cleaned_text'].str.split().str.len()
+            final_total += len(chunk)
+            total_length += int(chunk['text_length'].sum())
+            total_words += int(chunk['word_count'].sum())
+            if 'image_url' in chunk.columns:
+                image_count += int(chunk['image_url'].notna().sum())
+            
+            sample_rows = sum(len(s) for s in samples)
+            if sample_rows < 5:
+                samples.append(chunk.head(5 - sample_rows))
+            
+            final_columns = [col for col in output_columns if col in chunk.columns]
+            with metrics.stage('save', rows=len(chunk)):
+                writer.write(chunk[final_columns])
+            metrics.count('rows_out', len(chunk))
+            print(f"   Chunk {chunk_no + 1}: {initial_total} baris dibaca, {final_total} disimpan")
+    
+    print(f"🗑️ Duplikasi dihapus: {duplicates_removed} tweets")
+    if near_index is not None:
+        print(f"🗑️ Near-duplicate dihapus: {near_duplicates_removed} tweets (audit: {audit_file})")
+    print(f"✅ Data setelah cleaning & dedupe: {final_total} tweets")
+    
+    print_summary(
+        initial_total, final_total,
+        empty_removed, duplicates_removed,
+        total_length / final_total if final_total else float('nan'),
+        total_words / final_total if final_total else float('nan'),
+        image_count,
+        near_duplicates_removed,
+    )
+    
+    if samples:
+        print_samples(pd.concat(samples))
     
     print(f"\n✅ Preprocessing selesai! File disimpan di: {output_file}")
 
@@ -121,8 +300,13 @@ if __name__ == "__main__":
     # File paths
     input_file = r"D:/Code bisa di D/MATKUL S5/Datmin/dataset_raw.csv"
     output_file = "dataset_raw_fulltext.csv"
+    # Isi (mis. STREAM_CHUNKSIZE) untuk mode streaming bila file terlalu besar untuk RAM
+    chunksize = None
+    # None = hanya buang duplikat persis (default). Isi NEAR_DUP_THRESHOLD untuk ikut membuang
+    # near-duplicate; jumlah baris output jadi lebih sedikit dari hasil dedupe persis saja
+    near_dup_threshold = None
     
     # Run preprocessing
-    preprocess_data(input_file, output_file)
+    preprocess_data(input_file, output_file, chunksize=chunksize, near_dup_threshold=near_dup_threshold)
     
     print("\n🎉 Proses selesai! Data siap untuk analisis sentimen.")
\ No newline at end of file
@@ -0,0 +1,203 @@
+import os
+import json
+import pandas as pd
+
+from feature_selection import clean_text, text_digest
+from tweet_key import tweet_key
+from aggregate import AGGREGATE_FILE, SentimentAggregator
+import preprocess
+import sentimen
+
+# ==========================================
+# 1. KONFIGURASI
+# ==========================================
+
+# Manifest append-only: satu baris per tweet yang sudah pernah diproses (key, digest cleaned_text)
+MANIFEST_FILE = "manifest_processed.csv"
+
+FULLTEXT_FILE = "dataset_raw_fulltext.csv"
+PROCESSED_FILE = "data_final_preprocessing_no_filter.csv"
+SENTIMENT_FILE = "hasil_sentimen_final.csv"
+
+# ==========================================
+# 2. MANIFEST
+# ==========================================
+
+class Manifest:
+    """Daftar id_str & hash cleaned_text yang sudah diproses"""
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.journal = path + ".journal"
+        self.ids = set()
+        self.digests = set()
+        self.pending = []
+
+        self.recover()
+        if os.path.exists(path):
+            saved = pd.read_csv(path, dtype=str, keep_default_na=False)
+            self.ids.update(saved['id_str'])
+            self.digests.update(bytes.fromhex(d) for d in saved['digest'] if d)
+
+    def add(self, key, digest=None):
+        self.ids.add(key)
+        if digest is not None: self.digests.add(digest)
+        self.pending.append((key, digest.hex() if digest is not None else ''))
+
+    def save(self):
+        """Tambahkan entri baru ke file manifest (append, bukan tulis ulang)"""
+        if not self.pending: return
+        new_rows = pd.DataFrame(self.pending, columns=['id_str', 'digest'])
+        new_rows.to_csv(self.path, mode='a', header=not os.path.exists(self.path), index=False)
+        self.pending = []
+
+    # Satu batch = append ke beberapa file output + manifest, plus file yang ditulis ulang utuh
+    # (state agregat) yang disiapkan dulu di file sementara ("staged"). Ukuran semua file append
+    # dicatat di journal sebelum batch ditulis; titik commit = journal ditandai committed setelah
+    # manifest disimpan, baru file staged dipasang. Kalau proses mati sebelum commit, run berikutnya
+    # memotong file kembali ke ukuran semula dan batch diulang utuh; kalau mati sesudahnya,
+    # file staged yang belum terpasang dipasang (tidak ada batch yang terhitung dua kali).
+
+    def begin(self, paths, staged=None):
+        """Catat ukuran file output & manifest sebelum batch di-append; staged = {file sementara: file tujuan}"""
+        sizes = {path: os.path.getsize(path) if os.path.exists(path) else None
+                 for path in list(paths) + [self.path]}
+        self._write_journal({'sizes': sizes, 'staged': staged or {}, 'committed': False})
+
+    def commit(self):
+        """Simpan manifest, tandai batch selesai (titik commit), lalu pasang file staged"""
+        self.save()
+        with open(self.journal, encoding='utf-8') as f:
+            journal = json.load(f)
+        journal['committed'] = True
+        self._write_journal(journal)
+        self._finish(journal)
+
+    def recover(self):
+        """Selesaikan batch sebelumnya yang terputus: lanjutkan bila sudah commit, kalau belum batalkan"""
+        if not os.path.exists(self.journal): return
+        with open(self.journal, encoding='utf-8') as f:
+            journal = json.load(f)
+        if journal['committed']:
+            self._finish(journal)
+            print(f"↪️ Batch sebelumnya sudah di-commit, {len(journal['staged'])} file staged dipasang")
+            return
+        for path, size in journal['sizes'].items():
+            if size is None:
+                if os.path.exists(path): os.remove(path)
+            elif os.path.exists(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+        for tmp_path in journal['staged']:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+        os.remove(self.journal)
+        print(f"↩️ Batch sebelumnya tidak selesai, {len(journal['sizes'])} file dikembalikan ke kondisi semula")
+
+    def _write_journal(self, journal):
+        tmp_path = self.journal + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(journal, f)
+        os.replace(tmp_path, self.journal)
+
+    def _finish(self, journal):
+        for tmp_path, path in journal['staged'].items():
+            if os.path.exists(tmp_path): os.replace(tmp_path, path)
+        os.remove(self.journal)
+
+def append_csv(df, path):
+    """Append ke CSV yang sudah ada dengan urutan kolom mengikuti header file tersebut"""
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        header = pd.read_csv(path, nrows=0).columns
+        df.reindex(columns=header).to_csv(path, mode='a', header=False, index=False, encoding='utf-8')
+    else:
+        df.to_csv(path, index=False, encoding='utf-8')
+
+# ==========================================
+# 3. EKSEKUSI INKREMENTAL
+# ==========================================
+
+def run_incremental(input_file, manifest_file=MANIFEST_FILE, fulltext_file=FULLTEXT_FILE,
+                    processed_file=PROCESSED_FILE, sentiment_file=SENTIMENT_FILE, workers=1,
+                    aggregate_file=AGGREGATE_FILE):
+    """
+    Proses hanya tweet baru dari hasil scraping: clean -> dedupe -> preprocess -> scoring,
+    lalu hasilnya di-append ke file output yang sudah ada dan ditambahkan ke state agregat
+    (aggregate_file=None -> agregasi dilewati).
+    """
+    manifest = Manifest(manifest_file)
+    print(f"🔄 Manifest: {len(manifest.ids)} tweet sudah pernah diproses")
+
+    df = pd.read_csv(input_file, dtype={'id_str': str, 'conversation_id_str': str, 'user_id_str': str})
+    initial_total = len(df)
+    df['tweet_key'] = [tweet_key(row) for row in df.to_dict('records')]
+
+    # 1. Ambil hanya tweet yang belum ada di manifest (dan unik di batch ini)
+    df = df[~df['tweet_key'].isin(manifest.ids)]
+    df = df.drop_duplicates(subset=['tweet_key'], keep='first')
+    print(f"📊 Tweet baru: {len(df)} dari {initial_total}")
+    if df.empty:
+        print("✅ Tidak ada data baru.")
+        return df
+
+    # 2. Cleaning + dedupe terhadap semua cleaned_text yang pernah diproses
+    df['cleaned_text'] = df['full_text'].apply(clean_text)
+    keep = []
+    for key, text in zip(df['tweet_key'], df['cleaned_text']):
+        if not text:
+            manifest.add(key)
+            keep.append(False)
+            continue
+        digest = text_digest(text)
+        keep.append(digest not in manifest.digests)
+        manifest.add(key, digest if keep[-1] else None)
+    df = df[keep].copy()
+    print(f"🧹 Setelah cleaning & dedupe: {len(df)} tweet")
+
+    # File sementara -> file tujuan, dipasang saat commit
+    staged = {}
+
+    if not df.empty:
+        # 3. Preprocessing (cleaning regex, slang, stopword, stemming)
+        preprocess.stem_cache.load(preprocess.STEM_CACHE_FILE)
+        if workers > 1:
+            df['processed_text'] = preprocess.run_pipeline_parallel(df['cleaned_text'], workers=workers)
+        else:
+            df['processed_text'] = df['cleaned_text'].apply(preprocess.preprocess_text)
+        preprocess.stem_cache.save(preprocess.STEM_CACHE_FILE)
+
+        # 4. Scoring sentimen
+        scores = sentimen.score_batch(df['processed_text'])
+        df['label_pred'], df['score'] = scores['label'], scores['score']
+
+        # 5. Update agregat per jam/hari; state baru ditulis ke file staged dan baru menggantikan
+        #    aggregate_file setelah batch di-commit
+        if aggregate_file:
+            aggregator = SentimentAggregator(aggregate_file)
+            skipped = aggregator.update(df)
+            root, ext = os.path.splitext(aggregate_file)
+            staged[aggregator.save(f"{root}.staged{ext}")] = aggregate_file
+            print(f"📈 Agregat diperbarui: {len(aggregator.cells)} sel di {aggregate_file}"
+                  + (f" ({skipped} tweet tanpa created_at valid)" if skipped else ""))
+
+    # 6. Append ke output yang sudah ada + simpan manifest + pasang agregat dalam satu batch (lihat Manifest.begin)
+    manifest.begin([fulltext_file, processed_file, sentiment_file], staged)
+    if not df.empty:
+        append_csv(df[['cleaned_text']], fulltext_file)
+        append_csv(df[['cleaned_text', 'processed_text']], processed_file)
+        append_csv(df[['processed_text', 'label_pred']], sentiment_file)
+    manifest.commit()
+
+    print(f"💾 {len(df)} tweet baru di-append ke {fulltext_file}, {processed_file}, {sentiment_file}")
+    return df
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input_file', help="CSV hasil scraping (format dataset_raw.csv)")
+    parser.add_argument('--manifest', default=MANIFEST_FILE)
+    parser.add_argument('--workers', type=int, default=1, help="Jumlah proses paralel untuk preprocessing")
+    parser.add_argument('--aggregate', default=AGGREGATE_FILE, help="File state agregat ('' = tanpa agregasi)")
+    args = parser.parse_args()
+
+    run_incremental(args.input_file, manifest_file=args.manifest, workers=args.workers,
+                    aggregate_file=args.aggregate or None)
@@ -0,0 +1,231 @@
+import os
+import json
+import numpy as np
+import torch
+from torch.utils.data import Dataset, Sampler
+
+from indobert_infer import MAX_LEN, BASE_MODEL, LABELS
+
+# ==========================================
+# 1. KONFIGURASI
+# ==========================================
+# Pemakaian di Sentimen2.ipynb (ganti SentimentDataset):
+#   prepare_splits(tokenizer=tokenizer)             # sekali saja, hasil di folder TOKENIZED_DIR
+#   train_dataset = MemmapSentimentDataset(os.path.join(TOKENIZED_DIR, 'train'))
+#   val_dataset   = MemmapSentimentDataset(os.path.join(TOKENIZED_DIR, 'val'))
+#   trainer = build_trainer(model=model, args=training_args, train_dataset=train_dataset,
+#                           eval_dataset=val_dataset, compute_metrics=compute_metrics, ...)
+
+TOKENIZED_DIR = "tokenized"
+DATASET_FILE = "dataset_sentimen - Sheet2 (1).csv"
+SEED = 42
+VAL_SIZE = 0.2
+
+# Banyak teks per panggilan tokenizer (batas memori saat tokenisasi data besar)
+TOKENIZE_CHUNKSIZE = 10_000
+
+def load_splits(filename=DATASET_FILE):
+    """(train_texts, val_texts, train_labels, val_labels) sama persis dengan split di notebook"""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    df = pd.read_csv(filename)
+    df = df.dropna(subset=['processed_text', 'label'])
+    df['label_encoded'] = df['label'].map({label: i for i, label in enumerate(LABELS)})
+
+    return train_test_split(
+        df['processed_text'].tolist(),
+        df['label_encoded'].tolist(),
+        test_size=VAL_SIZE,
+        random_state=SEED,
+        stratify=df['label_encoded']
+    )
+
+# ==========================================
+# 2. TOKENISASI SEKALI KE MEMMAP
+# ==========================================
+
+def tokenize_to_memmap(texts, labels, tokenizer, out_dir, max_len=MAX_LEN):
+    """
+    Tokenisasi sekali, hasil ditulis ke file .npy yang nanti dibaca dengan mmap:
+    input_ids [n, max_len] int32, attention_mask [n, max_len] int8, labels [n] int64, lengths [n] int32.
+    Baris tetap selebar max_len di disk, tapi yang dibaca & di-pad saat training hanya sepanjang `lengths`.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    texts = [str(text) for text in texts]
+    n = len(texts)
+    open_memmap = np.lib.format.open_memmap
+
+    input_ids = open_memmap(os.path.join(out_dir, 'input_ids.npy'), mode='w+', dtype=np.int32, shape=(n, max_len))
+    attention_mask = open_memmap(os.path.join(out_dir, 'attention_mask.npy'), mode='w+', dtype=np.int8, shape=(n, max_len))
+    lengths = np.zeros(n, dtype=np.int32)
+
+    pad_id = tokenizer.pad_token_id or 0
+    for start in range(0, n, TOKENIZE_CHUNKSIZE):
+        encoding = tokenizer(
+            texts[start:start + TOKENIZE_CHUNKSIZE],
+            add_special_tokens=True,
+            max_length=max_len,
+            truncation=True,
+            padding=False,
+            return_attention_mask=False,
+        )
+        for row, ids in enumerate(encoding['input_ids'], start):
+            input_ids[row, :len(ids)] = ids
+            input_ids[row, len(ids):] = pad_id
+            attention_mask[row, :len(ids)] = 1
+            attention_mask[row, len(ids):] = 0
+            lengths[row] = len(ids)
+
+    input_ids.flush()
+    attention_mask.flush()
+    np.save(os.path.join(out_dir, 'lengths.npy'), lengths)
+    np.save(os.path.join(out_dir, 'labels.npy'), np.asarray(labels, dtype=np.int64))
+
+    with open(os.path.join(out_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'n': n,
+            'max_len': max_len,
+            'pad_id': pad_id,
+            'tokenizer': getattr(tokenizer, 'name_or_path', None),
+        }, f, indent=2)
+    return out_dir
+
+def prepare_splits(dataset_file=DATASET_FILE, out_dir=TOKENIZED_DIR, tokenizer=None, max_len=MAX_LEN):
+    """Tokenisasi split train & val notebook ke out_dir/train dan out_dir/val"""
+    if tokenizer is None:
+        from indobert_infer import load_tokenizer
+        tokenizer = load_tokenizer(BASE_MODEL)
+
+    train_texts, val_texts, train_labels, val_labels = load_splits(dataset_file)
+    tokenize_to_memmap(train_texts, train_labels, tokenizer, os.path.join(out_dir, 'train'), max_len)
+    tokenize_to_memmap(val_texts, val_labels, tokenizer, os.path.join(out_dir, 'val'), max_len)
+    print(f"💾 Tokenisasi selesai: {len(train_texts)} train, {len(val_texts)} val -> {out_dir}")
+    return out_dir
+
+# ==========================================
+# 3. DATASET, SAMPLER & COLLATOR
+# ==========================================
+
+class MemmapSentimentDataset(Dataset):
+    """
+    Pengganti SentimentDataset: tidak ada tokenisasi per epoch.
+    __getitem__ mengembalikan view numpy ke file memmap (tanpa salinan),
+    dipotong sepanjang token aslinya; tensor baru dibuat sekali per batch di collator.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.input_ids = np.load(os.path.join(data_dir, 'input_ids.npy'), mmap_mode='r')
+        self.attention_mask = np.load(os.path.join(data_dir, 'attention_mask.npy'), mmap_mode='r')
+        self.labels = np.load(os.path.join(data_dir, 'labels.npy'), mmap_mode='r')
+        self.lengths = np.load(os.path.join(data_dir, 'lengths.npy'))
+        with open(os.path.join(data_dir, 'meta.json'), encoding='utf-8') as f:
+            self.pad_id = json.load(f)['pad_id']
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, item):
+        length = self.lengths[item]
+        return {
+            'input_ids': self.input_ids[item, :length],
+            'attention_mask': self.attention_mask[item, :length],
+            'labels': self.labels[item],
+        }
+
+class LengthGroupedSampler(Sampler):
+    """
+    Acak indeks, potong jadi mega-batch (batch_size * mega_batch_mult), lalu urutkan tiap
+    mega-batch berdasarkan panjang. Batch berisi teks dengan panjang mirip (padding sedikit),
+    urutan antar epoch tetap acak. Panggil set_epoch(epoch) untuk acakan yang berbeda tiap epoch.
+    """
+
+    def __init__(self, lengths, batch_size, mega_batch_mult=50, seed=SEED):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.mega_batch_mult = mega_batch_mult
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed + self.epoch)
+        self.epoch += 1
+        order = rng.permutation(len(self.lengths))
+        mega_size = self.batch_size * self.mega_batch_mult
+        batches = []
+        for start in range(0, len(order), mega_size):
+            mega = order[start:start + mega_size]
+            mega = mega[np.argsort(-self.lengths[mega], kind='stable')]
+            batches.extend(mega[i:i + self.batch_size] for i in range(0, len(mega), self.batch_size))
+        # Batch terpanjang di depan: kalau memori kurang, error muncul di awal training
+        longest = max(range(len(batches)), key=lambda i: self.lengths[batches[i]].max(), default=0)
+        if batches: batches[0], batches[longest] = batches[longest], batches[0]
+        for batch in batches:
+            yield from batch.tolist()
+
+class DynamicPaddingCollator:
+    """Pad batch hanya sepanjang teks terpanjang di batch itu (bukan selalu max_len)"""
+
+    def __init__(self, pad_id=0, pad_to_multiple_of=None):
+        self.pad_id = pad_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features):
+        width = max(len(feature['input_ids']) for feature in features)
+        if self.pad_to_multiple_of:
+            width = -(-width // self.pad_to_multiple_of) * self.pad_to_multiple_of
+
+        input_ids = np.full((len(features), width), self.pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(features), width), dtype=np.int64)
+        for row, feature in enumerate(features):
+            length = len(feature['input_ids'])
+            input_ids[row, :length] = feature['input_ids']
+            attention_mask[row, :length] = feature['attention_mask']
+
+        return {
+            'input_ids': torch.from_numpy(input_ids),
+            'attention_mask': torch.from_numpy(attention_mask),
+            'labels': torch.tensor([int(feature['labels']) for feature in features], dtype=torch.long),
+        }
+
+def make_dataloader(dataset, batch_size, shuffle=True, num_workers=0, seed=SEED):
+    """DataLoader dengan length-grouped sampler (train) atau urutan panjang (eval)"""
+    from torch.utils.data import DataLoader
+    if shuffle:
+        sampler = LengthGroupedSampler(dataset.lengths, batch_size, seed=seed)
+    else:
+        sampler = np.argsort(dataset.lengths, kind='stable').tolist()
+    return DataLoader(dataset, batch_size=batch_size, sampler=sampler, num_workers=num_workers,
+                      collate_fn=DynamicPaddingCollator(dataset.pad_id))
+
+def build_trainer(model, args, train_dataset, eval_dataset=None, **kwargs):
+    """Trainer HuggingFace yang memakai LengthGroupedSampler & DynamicPaddingCollator"""
+    from transformers import Trainer
+
+    class LengthGroupedTrainer(Trainer):
+        def _get_train_sampler(self, *sampler_args, **sampler_kwargs):
+            return LengthGroupedSampler(self.train_dataset.lengths, self.args.per_device_train_batch_size,
+                                        seed=self.args.seed)
+
+    kwargs.setdefault('data_collator', DynamicPaddingCollator(train_dataset.pad_id))
+    return LengthGroupedTrainer(model=model, args=args, train_dataset=train_dataset,
+                                eval_dataset=eval_dataset, **kwargs)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Tokenisasi dataset sentimen sekali ke memmap NumPy")
+    parser.add_argument('--dataset', default=DATASET_FILE)
+    parser.add_argument('--out-dir', default=TOKENIZED_DIR)
+    parser.add_argument('--tokenizer', default=BASE_MODEL)
+    parser.add_argument('--max-len', type=int, default=MAX_LEN)
+    args = parser.parse_args()
+
+    from indobert_infer import load_tokenizer
+    prepare_splits(args.dataset, args.out_dir, load_tokenizer(args.tokenizer), args.max_len)
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import numpy as np
+
+from indobert_infer import (
+    MODEL_DIR, MAX_LEN, QUANTIZED_WEIGHTS, ONNX_FILE,
+    IndoBertPredictor, load_predictor, load_tokenizer, quantize_model,
+)
+from indobert_data import DATASET_FILE, load_splits
+
+# ==========================================
+# 1. KONFIGURASI
+# ==========================================
+
+INT8_DIR = "indobert-sentimen-int8"
+ONNX_DIR = "indobert-sentimen-onnx"
+REPORT_FILE = "indobert_export_report.json"
+
+def load_validation_split(filename=DATASET_FILE):
+    """(val_texts, val_labels) dengan split yang sama persis dengan Sentimen2.ipynb"""
+    _, val_texts, _, val_labels = load_splits(filename)
+    return val_texts, np.asarray(val_labels)
+
+def _copy_metadata(model, model_dir, out_dir):
+    """Config & tokenizer ikut disalin supaya folder export bisa dimuat sendiri"""
+    os.makedirs(out_dir, exist_ok=True)
+    model.config.save_pretrained(out_dir)
+    load_tokenizer(model_dir).save_pretrained(out_dir)
+
+# ==========================================
+# 2. EXPORT
+# ==========================================
+
+def export_int8(model_dir=MODEL_DIR, out_dir=INT8_DIR):
+    """Simpan model PyTorch dengan dynamic quantization int8 (nn.Linear)"""
+    import torch
+    fp32 = IndoBertPredictor.from_pretrained(model_dir)
+    _copy_metadata(fp32.model, model_dir, out_dir)
+
+    model = quantize_model(fp32.model)
+    torch.save(model.state_dict(), os.path.join(out_dir, QUANTIZED_WEIGHTS))
+    print(f"💾 Model int8 disimpan di: {out_dir}")
+    return out_dir
+
+def export_onnx(model_dir=MODEL_DIR, out_dir=ONNX_DIR, int8=True, opset=17):
+    """
+    Export ke ONNX dengan sumbu batch & panjang dinamis (cocok untuk dynamic padding),
+    lalu (default) bobotnya dikuantisasi int8 dengan onnxruntime.quantization.
+    """
+    import torch
+    fp32 = IndoBertPredictor.from_pretrained(model_dir)
+    _copy_metadata(fp32.model, model_dir, out_dir)
+
+    onnx_path = os.path.join(out_dir, ONNX_FILE)
+    fp32_path = onnx_path + ".fp32" if int8 else onnx_path
+    dummy = torch.ones((2, 16), dtype=torch.long)
+    torch.onnx.export(
+        fp32.model, (dummy, torch.ones_like(dummy)), fp32_path,
+        input_names=['input_ids', 'attention_mask'],
+        output_names=['logits'],
+        dynamic_axes={
+            'input_ids': {0: 'batch', 1: 'seq'},
+            'attention_mask': {0: 'batch', 1: 'seq'},
+            'logits': {0: 'batch'},
+        },
+        opset_version=opset,
+        dynamo=False,
+    )
+
+    if int8:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(fp32_path, onnx_path, weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+
+    print(f"💾 Model ONNX{' int8' if int8 else ''} disimpan di: {out_dir}")
+    return out_dir
+
+# ==========================================
+# 3. PARITY CHECK & LAPORAN LATENCY / MEMORI
+# ==========================================
+
+def current_rss_mb():
+    """RSS proses saat ini (Linux /proc), None kalau tidak tersedia"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def dir_size_mb(path, filenames):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in filenames
+               if os.path.exists(os.path.join(path, name))) / 1024 ** 2
+
+def measure(predictor, texts, single_samples=50):
+    """Latency per tweet (satu-satu, seperti predict_text) & throughput batch"""
+    latencies = []
+    for text in texts[:single_samples]:
+        start = time.perf_counter()
+        predictor.predict_text(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    probs = predictor.predict_proba(texts)
+    elapsed = time.perf_counter() - start
+
+    return probs, {
+        'single_p50_ms': float(np.percentile(latencies, 50)) if latencies else None,
+        'single_p95_ms': float(np.percentile(latencies, 95)) if latencies else None,
+        'batch_total_s': elapsed,
+        'batch_ms_per_text': elapsed * 1000 / max(len(texts), 1),
+        'batch_texts_per_s': len(texts) / max(elapsed, 1e-9),
+    }
+
+def parity_report(model_dir=MODEL_DIR, int8_dir=INT8_DIR, onnx_dir=ONNX_DIR,
+                  dataset_file=DATASET_FILE, num_threads=None, max_texts=None):
+    """
+    Bandingkan label int8 / ONNX dengan model fp32 di split validasi notebook,
+    sekaligus catat latency, RSS setelah model dimuat, dan ukuran file model.
+    """
+    texts, labels = load_validation_split(dataset_file)
+    if max_texts: texts, labels = texts[:max_texts], labels[:max_texts]
+    texts = [str(text) for text in texts]
+
+    variants = [('fp32', model_dir), ('int8', int8_dir), ('onnx', onnx_dir)]
+    weight_files = {
+        'fp32': ['model.safetensors', 'pytorch_model.bin'],
+        'int8': [QUANTIZED_WEIGHTS],
+        'onnx': [ONNX_FILE],
+    }
+
+    report = {'n_val': len(texts), 'max_len': MAX_LEN, 'backends': {}}
+    reference = None
+    for backend, path in variants:
+        if not os.path.isdir(path):
+            print(f"⚠️ Lewati {backend}: folder {path} tidak ada")
+            continue
+
+        rss_before = current_rss_mb()
+        predictor = load_predictor(path, backend, num_threads=num_threads)
+        rss_after = current_rss_mb()
+
+        probs, timing = measure(predictor, texts)
+        pred = probs.argmax(axis=1)
+        entry = {
+            **timing,
+            'model_size_mb': dir_size_mb(path, weight_files[backend]),
+            'rss_load_mb': (rss_after - rss_before) if rss_before is not None else None,
+            'accuracy': float((pred == labels).mean()) if len(labels) else None,
+        }
+        if reference is None:
+            reference = (backend, probs, pred)
+        else:
+            entry['label_agreement'] = float((pred == reference[2]).mean()) if len(pred) else 1.0
+            entry['label_mismatch'] = int((pred != reference[2]).sum())
+            entry['max_prob_diff'] = float(np.abs(probs - reference[1]).max()) if len(pred) else 0.0
+        report['backends'][backend] = entry
+        del predictor
+
+    return report
+
+def print_report(report):
+    print("\n" + "=" * 60)
+    print(f"📊 PARITY & LATENCY ({report['n_val']} teks validasi)")
+    print("=" * 60)
+    for backend, entry in report['backends'].items():
+        print(f"\n[{backend}]")
+        print(f"  Ukuran model         : {entry['model_size_mb']:.1f} MB")
+        if entry['rss_load_mb'] is not None:
+            print(f"  RSS setelah load     : +{entry['rss_load_mb']:.1f} MB")
+        if entry['single_p50_ms'] is not None:
+            print(f"  Latency 1 tweet      : p50 {entry['single_p50_ms']:.1f} ms, p95 {entry['single_p95_ms']:.1f} ms")
+        print(f"  Batch                : {entry['batch_ms_per_text']:.2f} ms/teks ({entry['batch_texts_per_s']:.1f} teks/detik)")
+        if entry['accuracy'] is not None:
+            print(f"  Akurasi              : {entry['accuracy']:.2%}")
+        if 'label_agreement' in entry:
+            print(f"  Label sama dgn fp32  : {entry['label_agreement']:.2%} ({entry['label_mismatch']} beda)")
+            print(f"  Selisih prob maks    : {entry['max_prob_diff']:.4f}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Export IndoBERT ke int8 / ONNX lalu cek parity dengan fp32")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--int8-dir', default=INT8_DIR)
+    parser.add_argument('--onnx-dir', default=ONNX_DIR)
+    parser.add_argument('--onnx-fp32', action='store_true', help="ONNX tanpa kuantisasi int8")
+    parser.add_argument('--dataset', default=DATASET_FILE)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--max-texts', type=int, default=None)
+    parser.add_argument('--report', default=REPORT_FILE)
+    parser.add_argument('--skip-export', action='store_true', help="Hanya jalankan parity check")
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export_int8(args.model_dir, args.int8_dir)
+        export_onnx(args.model_dir, args.onnx_dir, int8=not args.onnx_fp32)
+
+    report = parity_report(args.model_dir, args.int8_dir, args.onnx_dir, args.dataset,
+                           num_threads=args.threads, max_texts=args.max_texts)
+    print_report(report)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Laporan disimpan di: {args.report}")
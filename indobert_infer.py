@@ -0,0 +1,233 @@
+import os
+import numpy as np
+
+# ==========================================
+# 1. KONFIGURASI
+# ==========================================
+# Checkpoint hasil training di Sentimen2.ipynb, mis. hasil
+#   trainer.save_model('indobert-sentimen'); tokenizer.save_pretrained('indobert-sentimen')
+# atau folder checkpoint Trainer (./results/checkpoint-XXX).
+# Checkpoint Trainer tidak menyimpan tokenizer, jadi tokenizer diambil dari BASE_MODEL.
+MODEL_DIR = "indobert-sentimen"
+BASE_MODEL = "indobenchmark/indobert-base-p1"
+
+MAX_LEN = 128
+BATCH_SIZE = 64
+
+# Nama file artifact hasil indobert_export.py (disimpan di folder yang sama dengan config & tokenizer)
+QUANTIZED_WEIGHTS = "model_int8.pt"
+ONNX_FILE = "model.onnx"
+
+# Sama dengan label_map di notebook: {'Negatif': 0, 'Netral': 1, 'Positif': 2}
+LABELS = ['Negatif', 'Netral', 'Positif']
+
+def softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+def load_tokenizer(model_dir, base_model=BASE_MODEL):
+    """Tokenizer cepat (Rust) dari checkpoint, fallback ke tokenizer model dasar"""
+    from transformers import AutoTokenizer
+    try:
+        return AutoTokenizer.from_pretrained(model_dir, use_fast=True)
+    except (OSError, ValueError):
+        return AutoTokenizer.from_pretrained(base_model, use_fast=True)
+
+# ==========================================
+# 2. PREDICTOR (BATCH + BUCKET PANJANG)
+# ==========================================
+
+class IndoBertPredictor:
+    """
+    Inference IndoBERT di CPU:
+    - tokenisasi semua teks sekaligus dengan fast tokenizer (tanpa padding)
+    - teks diurutkan berdasarkan panjang token lalu dipotong per batch (bucket panjang),
+      tiap batch hanya di-pad sepanjang teks terpanjang di batch itu (dynamic padding)
+    - forward pass di bawah torch.inference_mode()
+    - probabilitas dikembalikan sesuai urutan input asli
+    """
+
+    def __init__(self, model, tokenizer, max_len=MAX_LEN, batch_size=BATCH_SIZE):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_len = max_len
+        self.batch_size = batch_size
+        self.pad_id = tokenizer.pad_token_id or 0
+
+    @classmethod
+    def from_pretrained(cls, model_dir=MODEL_DIR, num_threads=None, **kwargs):
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        if num_threads: torch.set_num_threads(num_threads)
+        model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+        model.eval()
+        return cls(model, load_tokenizer(model_dir), **kwargs)
+
+    def forward(self, input_ids, attention_mask):
+        """Satu batch (array int64 [batch, panjang]) -> logits numpy [batch, n_label]"""
+        import torch
+        with torch.inference_mode():
+            logits = self.model(
+                input_ids=torch.from_numpy(input_ids),
+                attention_mask=torch.from_numpy(attention_mask),
+            ).logits
+        return logits.float().numpy()
+
+    def tokenize(self, texts):
+        encoding = self.tokenizer(
+            [str(text) for text in texts],
+            add_special_tokens=True,
+            max_length=self.max_len,
+            truncation=True,
+            padding=False,
+            return_attention_mask=False,
+        )
+        return encoding['input_ids']
+
+    def iter_batches(self, token_ids):
+        """(posisi asli, input_ids, attention_mask) per batch, teks dengan panjang mirip dikelompokkan"""
+        lengths = np.fromiter(map(len, token_ids), dtype=np.int64, count=len(token_ids))
+        order = np.argsort(lengths, kind='stable')
+        for start in range(0, len(order), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            width = int(lengths[idx].max())
+            input_ids = np.full((len(idx), width), self.pad_id, dtype=np.int64)
+            attention_mask = np.zeros((len(idx), width), dtype=np.int64)
+            for row, i in enumerate(idx):
+                input_ids[row, :lengths[i]] = token_ids[i]
+                attention_mask[row, :lengths[i]] = 1
+            yield idx, input_ids, attention_mask
+
+    def predict_proba(self, texts):
+        """Probabilitas tiap label, array [n_teks, n_label] sesuai urutan input"""
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, len(LABELS)), dtype=np.float32)
+
+        token_ids = self.tokenize(texts)
+        probs = None
+        for idx, input_ids, attention_mask in self.iter_batches(token_ids):
+            batch_probs = softmax(self.forward(input_ids, attention_mask))
+            if probs is None:
+                probs = np.empty((len(token_ids), batch_probs.shape[1]), dtype=np.float32)
+            probs[idx] = batch_probs
+        return probs
+
+    def predict(self, texts):
+        """(list label, array confidence) untuk banyak teks sekaligus"""
+        probs = self.predict_proba(texts)
+        pred_idx = probs.argmax(axis=1)
+        return [LABELS[i] for i in pred_idx], probs[np.arange(len(pred_idx)), pred_idx]
+
+    def predict_text(self, text):
+        """Sama dengan predict_text di notebook: (label, confidence) untuk satu teks"""
+        labels, confidence = self.predict([text])
+        return labels[0], float(confidence[0])
+
+# ==========================================
+# 3. BACKEND CPU LAIN (INT8 / ONNX RUNTIME)
+# ==========================================
+
+def quantize_model(model):
+    """Dynamic quantization int8 untuk semua nn.Linear (bobot int8, aktivasi dikuantisasi saat jalan)"""
+    import torch
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+class QuantizedIndoBertPredictor(IndoBertPredictor):
+    """Model PyTorch int8 (dynamic quantization), API sama dengan IndoBertPredictor"""
+
+    @classmethod
+    def from_pretrained(cls, model_dir=MODEL_DIR, num_threads=None, **kwargs):
+        import torch
+        from transformers import AutoConfig, AutoModelForSequenceClassification
+
+        if num_threads: torch.set_num_threads(num_threads)
+        # Modul terkuantisasi tidak bisa dibaca from_pretrained: bangun arsitektur dari config,
+        # kuantisasi dengan cara yang sama, baru isi state_dict int8
+        model = AutoModelForSequenceClassification.from_config(AutoConfig.from_pretrained(model_dir))
+        model = quantize_model(model.eval())
+        model.load_state_dict(torch.load(os.path.join(model_dir, QUANTIZED_WEIGHTS), weights_only=False))
+        model.eval()
+        return cls(model, load_tokenizer(model_dir), **kwargs)
+
+class OnnxIndoBertPredictor(IndoBertPredictor):
+    """Model ONNX dijalankan dengan ONNX Runtime (CPU), API sama dengan IndoBertPredictor"""
+
+    @classmethod
+    def from_pretrained(cls, model_dir=MODEL_DIR, num_threads=None, **kwargs):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads: options.intra_op_num_threads = num_threads
+        session = ort.InferenceSession(os.path.join(model_dir, ONNX_FILE), options,
+                                       providers=['CPUExecutionProvider'])
+        return cls(session, load_tokenizer(model_dir), **kwargs)
+
+    def forward(self, input_ids, attention_mask):
+        return self.model.run(['logits'], {'input_ids': input_ids, 'attention_mask': attention_mask})[0]
+
+BACKENDS = {
+    'fp32': IndoBertPredictor,
+    'int8': QuantizedIndoBertPredictor,
+    'onnx': OnnxIndoBertPredictor,
+}
+
+def load_predictor(model_dir=MODEL_DIR, backend='auto', **kwargs):
+    """
+    Muat predictor sesuai backend. 'auto' memilih dari isi folder:
+    model.onnx -> ONNX Runtime, model_int8.pt -> PyTorch int8, selain itu fp32.
+    """
+    if backend == 'auto':
+        if os.path.exists(os.path.join(model_dir, ONNX_FILE)):
+            backend = 'onnx'
+        elif os.path.exists(os.path.join(model_dir, QUANTIZED_WEIGHTS)):
+            backend = 'int8'
+        else:
+            backend = 'fp32'
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend tidak dikenal: {backend} (pilihan: auto, {', '.join(BACKENDS)})")
+    return BACKENDS[backend].from_pretrained(model_dir, **kwargs)
+
+# ==========================================
+# 4. EKSEKUSI UTAMA (LABEL SATU FILE)
+# ==========================================
+
+def label_file(input_file, output_file, model_dir=MODEL_DIR, text_col='processed_text',
+               batch_size=BATCH_SIZE, num_threads=None, backend='auto'):
+    """Beri label IndoBERT ke seluruh isi file (.csv / .parquet)"""
+    import time
+    from storage import load_table, save_table
+
+    predictor = load_predictor(model_dir, backend, num_threads=num_threads, batch_size=batch_size)
+    df = load_table(input_file)
+    texts = df[text_col].fillna('').astype(str).tolist()
+
+    print(f"Prediksi IndoBERT untuk {len(texts)} teks (batch {batch_size})...")
+    start = time.perf_counter()
+    labels, confidence = predictor.predict(texts)
+    elapsed = time.perf_counter() - start
+
+    df['label_bert'] = labels
+    df['confidence_bert'] = confidence
+    save_table(df, output_file)
+    print(f"Selesai dalam {elapsed:.1f} detik ({len(texts) / max(elapsed, 1e-9):.1f} teks/detik)")
+    print(f"Hasil disimpan di: {output_file}")
+    return df
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input_file')
+    parser.add_argument('output_file')
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--text-col', default='processed_text')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--threads', type=int, default=os.cpu_count())
+    parser.add_argument('--backend', default='auto', choices=['auto'] + list(BACKENDS))
+    args = parser.parse_args()
+
+    label_file(args.input_file, args.output_file, args.model_dir, args.text_col, args.batch_size,
+               args.threads, args.backend)
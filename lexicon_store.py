@@ -0,0 +1,253 @@
+import os
+import json
+import glob
+import pickle
+import hashlib
+import threading
+from datetime import datetime
+
+from phrase_matcher import PhraseMatcher
+from metrics import metrics
+
+# ==========================================
+# 1. KONFIGURASI
+# ==========================================
+# Kamus sentimen (frasa & kata positif/negatif) dan kamus slang disimpan di file JSON terpisah,
+# jadi mengubah kamus tidak perlu mengubah kode. Isi file di-compile sekali (stemming + automaton
+# frasa) ke artifact pickle bernama hash isinya: versi lama tetap tersimpan dan bisa dipakai lagi.
+#
+#   python lexicon_store.py                 # compile lexicon.json (kalau belum ada artifact-nya)
+#   python lexicon_store.py --file lexicon_v2.json
+#
+# Service yang sedang jalan bisa pindah ke versi baru tanpa restart (reload() / watch()).
+
+LEXICON_FILE = "lexicon.json"
+ARTIFACT_DIR = "lexicon_artifacts"
+# Naikkan jika struktur artifact berubah (artifact lama otomatis dianggap basi)
+ARTIFACT_FORMAT_VERSION = 3
+
+# Interval cek perubahan file saat watch() (detik)
+WATCH_INTERVAL = 2.0
+
+SECTIONS = ['positive_phrases', 'negative_phrases', 'positive_words', 'negative_words']
+
+# ==========================================
+# 2. FORMAT FILE & HASH
+# ==========================================
+
+def read_source(path=LEXICON_FILE):
+    """Baca & validasi file lexicon; ValueError kalau formatnya salah (versi lama tetap dipakai)"""
+    with open(path, encoding='utf-8') as f:
+        try:
+            source = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{path} bukan JSON yang valid: {e}")
+
+    for section in SECTIONS:
+        entries = source.get(section)
+        if not isinstance(entries, list) or not all(isinstance(e, str) for e in entries):
+            raise ValueError(f"{path}: '{section}' harus berupa list string")
+    slang = source.get('slang', {})
+    if not isinstance(slang, dict) or not all(isinstance(v, str) for v in slang.values()):
+        raise ValueError(f"{path}: 'slang' harus berupa object string -> string")
+    return {'version': str(source.get('version', '')), 'slang': slang,
+            **{section: source[section] for section in SECTIONS}}
+
+def content_hash(source):
+    """Hash isi kamus (bukan byte file): beda spasi/indentasi tidak memicu compile ulang"""
+    canonical = json.dumps({'format': ARTIFACT_FORMAT_VERSION, **source}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def artifact_path(digest, artifact_dir=ARTIFACT_DIR):
+    return os.path.join(artifact_dir, f"{digest[:16]}.pkl")
+
+# ==========================================
+# 3. COMPILE (STEMMING HANYA UNTUK ENTRI BARU)
+# ==========================================
+
+class CompiledLexicon:
+    """Satu versi kamus yang sudah siap dipakai (read-only setelah dibuat)"""
+
+    def __init__(self, version, digest, pos_phrases, neg_phrases, pos_set, neg_set, phrase_matcher, slang, stems):
+        self.version = version
+        self.hash = digest
+        self.pos_phrases = pos_phrases
+        self.neg_phrases = neg_phrases
+        self.pos_set = pos_set
+        self.neg_set = neg_set
+        self.phrase_matcher = phrase_matcher
+        self.slang = slang
+        # Entri mentah -> hasil stem, dipakai ulang saat compile versi berikutnya
+        self.stems = stems
+
+    def to_artifact(self):
+        return {'format': ARTIFACT_FORMAT_VERSION, **vars(self)}
+
+    @classmethod
+    def from_artifact(cls, artifact):
+        fields = dict(artifact)
+        fields['digest'] = fields.pop('hash')
+        fields.pop('format', None)
+        return cls(**fields)
+
+def compile_source(source, digest, known_stems=None):
+    """
+    Stemming entri kamus (frasa & kata), lalu bangun automaton frasa.
+    Entri yang sudah ada di known_stems tidak di-stem ulang; Sastrawi hanya dimuat kalau ada kata baru.
+    """
+    known_stems = known_stems or {}
+    entries = {entry for section in SECTIONS for entry in source[section]}
+    stems = {entry: known_stems[entry] for entry in entries if entry in known_stems}
+    new_entries = sorted(entries - stems.keys())
+    if new_entries:
+        # Cache stem per kata (hasil sama dengan stemmer.stem), kata yang pernah di-stem tidak ke Sastrawi lagi
+        import preprocess
+        stems.update((entry, preprocess.stem_cache.stem(entry)) for entry in new_entries)
+
+    # (Asumsi stopword sudah hilang di data, jadi frasa cukup di-stem untuk diambil kata kuncinya)
+    pos_phrases = [stems[p] for p in source['positive_phrases']]
+    neg_phrases = [stems[p] for p in source['negative_phrases']]
+    # Urutan prioritas frasa: positif dulu, lalu negatif
+    phrase_matcher = PhraseMatcher(pos_phrases + neg_phrases)
+    return CompiledLexicon(
+        source['version'], digest, pos_phrases, neg_phrases,
+        {stems[w] for w in source['positive_words']}, {stems[w] for w in source['negative_words']},
+        phrase_matcher, dict(source['slang']), stems,
+    ), len(new_entries)
+
+def read_artifact(path):
+    try:
+        with open(path, 'rb') as f:
+            artifact = pickle.load(f)
+        if artifact.get('format') == ARTIFACT_FORMAT_VERSION:
+            return CompiledLexicon.from_artifact(artifact)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError, KeyError, ValueError):
+        pass
+    return None
+
+def write_artifact(compiled, artifact_dir=ARTIFACT_DIR):
+    os.makedirs(artifact_dir, exist_ok=True)
+    path = artifact_path(compiled.hash, artifact_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(compiled.to_artifact(), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+def latest_artifact(artifact_dir=ARTIFACT_DIR):
+    """Artifact terbaru di folder (sumber stem untuk entri yang tidak berubah saat cold start)"""
+    paths = sorted(glob.glob(os.path.join(artifact_dir, "*.pkl")), key=os.path.getmtime, reverse=True)
+    for path in paths:
+        compiled = read_artifact(path)
+        if compiled is not None: return compiled
+    return None
+
+# ==========================================
+# 4. STORE DENGAN HOT RELOAD
+# ==========================================
+
+class LexiconStore:
+    """
+    Menyimpan versi kamus yang aktif. Pemakai mengambil snapshot lewat current() sekali per batch;
+    reload() menyiapkan versi baru di samping versi lama lalu menukarnya dengan satu assignment,
+    jadi batch yang sedang jalan tetap memakai versi lama sampai selesai.
+    """
+
+    def __init__(self, path=LEXICON_FILE, artifact_dir=ARTIFACT_DIR):
+        self.path = path
+        self.artifact_dir = artifact_dir
+        self._current = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def current(self):
+        compiled = self._current
+        if compiled is None:
+            self.reload()
+            compiled = self._current
+        return compiled
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _prepare(self, source, digest):
+        """Versi kamus untuk hash ini: dari artifact kalau ada, kalau tidak compile (inkremental)"""
+        path = artifact_path(digest, self.artifact_dir)
+        compiled = read_artifact(path) if os.path.exists(path) else None
+        if compiled is not None and compiled.hash == digest:
+            metrics.cache('lexicon_artifact', 1, 0)
+            return compiled
+
+        metrics.cache('lexicon_artifact', 0, 1)
+        previous = self._current or latest_artifact(self.artifact_dir)
+        compiled, n_stemmed = compile_source(source, digest, previous.stems if previous else None)
+        print(f"Lexicon {compiled.version or digest[:8]}: {n_stemmed} entri baru di-stem, "
+              f"{len(compiled.stems) - n_stemmed} dipakai ulang.")
+        try:
+            write_artifact(compiled, self.artifact_dir)
+        except OSError:
+            pass
+        return compiled
+
+    def reload(self, force=False):
+        """
+        Cek file kamus; kalau isinya berubah, siapkan versi baru lalu tukar secara atomik.
+        Mengembalikan True kalau versi aktif berganti. File yang rusak -> error, versi lama tetap aktif.
+        """
+        with self._lock:
+            signature = self._file_signature()
+            if not force and self._current is not None and signature == self._signature:
+                return False
+            # Dicatat sebelum dibaca: file rusak tidak dicoba ulang sampai isinya diubah lagi
+            self._signature = signature
+            source = read_source(self.path)
+            digest = content_hash(source)
+            if self._current is not None and self._current.hash == digest:
+                return False
+
+            compiled = self._prepare(source, digest)
+            previous = self._current
+            self._current = compiled
+        if previous is not None:
+            print(f"[{datetime.now():%H:%M:%S}] 🔁 Lexicon diganti: {previous.version or previous.hash[:8]} "
+                  f"-> {compiled.version or compiled.hash[:8]}")
+        return True
+
+    def watch(self, interval=WATCH_INTERVAL):
+        """Thread latar yang memanggil reload() tiap `interval` detik"""
+        if self._watcher is not None: return self._watcher
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload()
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Reload lexicon gagal, versi lama tetap dipakai: {e}")
+
+        self._watcher = threading.Thread(target=run, name="lexicon-watcher", daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def stop(self):
+        self._stop.set()
+
+store = LexiconStore()
+
+def get_compiled():
+    """Versi kamus aktif dari store default (dimuat saat pertama kali dipakai)"""
+    return store.current()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Compile file lexicon ke artifact (stem + automaton frasa)")
+    parser.add_argument('--file', default=LEXICON_FILE)
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    args = parser.parse_args()
+
+    compiled = LexiconStore(args.file, args.artifact_dir).current()
+    print(f"Lexicon {compiled.version} ({compiled.hash[:16]}): {len(compiled.pos_set)} kata positif, "
+          f"{len(compiled.neg_set)} kata negatif, {len(compiled.phrase_matcher)} frasa, {len(compiled.slang)} slang")
+    print(f"Artifact: {artifact_path(compiled.hash, args.artifact_dir)}")
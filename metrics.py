@@ -0,0 +1,261 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from collections import Counter
+
+# ==========================================
+# INSTRUMENTASI PIPELINE (TIMER, COUNTER, CACHE, PROFILING)
+# ==========================================
+# Default mati. Aktifkan lewat environment variable (berlaku untuk semua script):
+#   SENTIMEN_METRICS=metrics.jsonl   -> JSON-lines, satu record per tahap/counter (di-append per run)
+#   SENTIMEN_METRICS=metrics.prom    -> file teks Prometheus (untuk textfile collector node_exporter)
+#   SENTIMEN_PROFILE=run.prof        -> cProfile (buka dengan pstats / snakeviz)
+#   SENTIMEN_PROFILE=run.folded      -> sampling profiler, format folded stack (untuk flamegraph)
+# atau argumen --metrics / --profile di preprocess.py dan sentimen.py.
+#
+# Saat mati, metrics.stage() hanya mengembalikan context manager kosong yang sama
+# dan counter langsung return, jadi aman dibiarkan terpasang di run produksi.
+
+METRICS_ENV = "SENTIMEN_METRICS"
+PROFILE_ENV = "SENTIMEN_PROFILE"
+PROM_PREFIX = "sentimen"
+
+# Interval sampling profiler (detik)
+SAMPLE_INTERVAL = 0.005
+
+class _NullStage:
+    """Stage kosong saat instrumentasi mati"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_rows(self, n):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    __slots__ = ('metrics', 'name', 'rows', 'start')
+
+    def __init__(self, metrics, name, rows):
+        self.metrics = metrics
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics._record_stage(self.name, time.perf_counter() - self.start, self.rows, exc[0] is None)
+        return False
+
+    def add_rows(self, n):
+        """Tambah jumlah baris yang diproses (kalau baru diketahui di dalam tahap)"""
+        self.rows = (self.rows or 0) + n
+
+class SamplingProfiler:
+    """Sampling stack thread utama tiap `interval` detik, hasil ditulis dalam format folded stack"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = threading.main_thread().ident
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack: self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sentimen-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, path):
+        self._stop.set()
+        if self._thread is not None: self._thread.join()
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Metrics:
+    """Kumpulan metrik satu run: waktu per tahap, counter baris, baris dibuang per filter, hit rate cache"""
+
+    def __init__(self):
+        self.enabled = False
+        self.output = None
+        self.profile_path = None
+        self._profiler = None
+        self._atexit = False
+        self.reset()
+
+    def reset(self):
+        self.run_id = time.strftime('%Y%m%dT%H%M%S') + f"-{os.getpid()}"
+        self.script = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None
+        self.stages = []
+        self.counters = Counter()
+        self.dropped_rows = Counter()
+        self.caches = {}
+        self._flushed = False
+
+    def enable(self, output=None, profile=None):
+        """Nyalakan instrumentasi; output .prom -> Prometheus, selain itu JSON-lines"""
+        if output:
+            self.output = output
+            self.enabled = True
+        if profile and self._profiler is None:
+            self.enabled = True
+            self.profile_path = profile
+            if profile.endswith('.folded'):
+                self._profiler = SamplingProfiler()
+                self._profiler.start()
+            else:
+                import cProfile
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+        if self.enabled and not self._atexit:
+            atexit.register(self.flush)
+            self._atexit = True
+        return self
+
+    # --- Hook yang dipanggil di pipeline ---
+
+    def stage(self, name, rows=None):
+        """Context manager timer satu tahap: `with metrics.stage('clean_text', rows=len(df)):`"""
+        if not self.enabled: return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def count(self, name, n=1):
+        if not self.enabled: return
+        self.counters[name] += n
+
+    def dropped(self, filter_name, n):
+        """Baris yang dibuang oleh satu filter (kosong, duplikat, bahasa, dst.)"""
+        if not self.enabled: return
+        self.dropped_rows[filter_name] += int(n)
+
+    def cache(self, name, hits, misses, size=None):
+        """Snapshot hit/miss kumulatif sebuah cache (nilai terakhir yang dipakai)"""
+        if not self.enabled: return
+        total = hits + misses
+        self.caches[name] = {
+            'hits': int(hits),
+            'misses': int(misses),
+            'hit_rate': hits / total if total else 0.0,
+            'size': size,
+        }
+
+    def _record_stage(self, name, seconds, rows, ok):
+        self.stages.append({
+            'stage': name,
+            'seconds': seconds,
+            'rows': rows,
+            'rows_per_s': rows / seconds if rows and seconds > 0 else None,
+            'ok': ok,
+        })
+
+    # --- Output ---
+
+    def records(self):
+        base = {'run': self.run_id, 'script': self.script}
+        for stage in self.stages:
+            yield {**base, 'type': 'stage', **stage}
+        for name, value in self.counters.items():
+            yield {**base, 'type': 'counter', 'name': name, 'value': value}
+        for name, value in self.dropped_rows.items():
+            yield {**base, 'type': 'dropped', 'filter': name, 'rows': value}
+        for name, stats in self.caches.items():
+            yield {**base, 'type': 'cache', 'cache': name, **stats}
+
+    def to_prometheus(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            if not samples: return
+            lines.append(f"# HELP {PROM_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PROM_PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{PROM_PREFIX}_{name}{{{label_text}}} {value}")
+
+        # Tahap dengan nama sama (mis. per chunk) dijumlahkan
+        seconds, rows = Counter(), Counter()
+        for stage in self.stages:
+            seconds[stage['stage']] += stage['seconds']
+            if stage['rows'] is not None: rows[stage['stage']] += stage['rows']
+        script = {'script': self.script or ''}
+        metric('stage_seconds', 'gauge', "Durasi tahap pipeline (detik)",
+               [({**script, 'stage': k}, v) for k, v in seconds.items()])
+        metric('stage_rows', 'gauge', "Baris yang diproses per tahap",
+               [({**script, 'stage': k}, v) for k, v in rows.items()])
+        metric('rows', 'gauge', "Counter baris",
+               [({**script, 'name': k}, v) for k, v in self.counters.items()])
+        metric('rows_dropped', 'gauge', "Baris yang dibuang per filter",
+               [({**script, 'filter': k}, v) for k, v in self.dropped_rows.items()])
+        metric('cache_hits', 'gauge', "Cache hit",
+               [({**script, 'cache': k}, v['hits']) for k, v in self.caches.items()])
+        metric('cache_misses', 'gauge', "Cache miss",
+               [({**script, 'cache': k}, v['misses']) for k, v in self.caches.items()])
+        metric('cache_hit_ratio', 'gauge', "Rasio cache hit",
+               [({**script, 'cache': k}, v['hit_rate']) for k, v in self.caches.items()])
+        metric('last_run_timestamp_seconds', 'gauge', "Waktu selesai run terakhir",
+               [(script, int(time.time()))])
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Tulis metrik & hasil profiling (dipanggil otomatis saat proses selesai)"""
+        if not self.enabled or self._flushed: return
+        self._flushed = True
+
+        if self._profiler is not None:
+            if isinstance(self._profiler, SamplingProfiler):
+                self._profiler.stop(self.profile_path)
+            else:
+                self._profiler.disable()
+                self._profiler.dump_stats(self.profile_path)
+            self._profiler = None
+
+        if not self.output: return
+        if self.output.endswith('.prom'):
+            # Tulis atomik: textfile collector tidak boleh membaca file setengah jadi
+            tmp_path = self.output + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, self.output)
+        else:
+            with open(self.output, 'a', encoding='utf-8') as f:
+                for record in self.records():
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+metrics = Metrics()
+
+def add_arguments(parser):
+    """Argumen --metrics / --profile untuk argparse di script pipeline"""
+    parser.add_argument('--metrics', default=None, help="Simpan metrik run (.jsonl atau .prom)")
+    parser.add_argument('--profile', default=None, help="Profiling run (.prof = cProfile, .folded = sampling)")
+
+def enable_from_args(args):
+    if args.metrics or args.profile:
+        metrics.enable(args.metrics, args.profile)
+
+def _is_main_process():
+    # Worker ProcessPoolExecutor (start method spawn) ikut meng-import modul ini; jangan aktif di sana
+    import multiprocessing
+    return multiprocessing.parent_process() is None
+
+if (os.environ.get(METRICS_ENV) or os.environ.get(PROFILE_ENV)) and _is_main_process():
+    metrics.enable(os.environ.get(METRICS_ENV), os.environ.get(PROFILE_ENV))
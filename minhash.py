@@ -0,0 +1,146 @@
+import zlib
+import numpy as np
+
+# ==========================================
+# NEAR-DUPLICATE (MINHASH + LSH BANDING)
+# ==========================================
+# Jaccard kemiripan dihitung dari himpunan shingle kata. Link (http..., www...) disamakan jadi
+# satu token, karena tweet copy-paste buzzer biasanya hanya beda link t.co-nya.
+# Tiap teks dicek hanya ke bucket LSH-nya (b band), bukan ke semua teks lain: O(n * b), bukan O(n^2).
+
+NUM_PERM = 64
+THRESHOLD = 0.8
+SHINGLE_SIZE = 1
+SEED = 1
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# np.trapz berganti nama jadi np.trapezoid di NumPy 2
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+# Banyak shingle yang di-hash sekaligus saat membuat signature (batas memori: baris x num_perm x 8 byte)
+_HASH_BLOCK = 200_000
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Himpunan shingle kata (n-gram) dari teks, link dianggap token yang sama"""
+    tokens = ['<url>' if token.startswith(('http', 'www')) else token for token in text.split()]
+    if size > 1:
+        tokens = [" ".join(tokens[i:i + size]) for i in range(max(len(tokens) - size + 1, 1))]
+    return set(tokens)
+
+def optimal_bands(threshold, num_perm):
+    """
+    Pilih (band, baris per band) dengan b * r <= num_perm yang meminimalkan
+    luas false positive + false negative kurva S 1 - (1 - s^r)^b di sekitar threshold
+    """
+    s = np.linspace(0, 1, 201)
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            prob = 1 - (1 - s ** rows) ** bands
+            false_pos = _trapezoid(np.where(s < threshold, prob, 0), s)
+            false_neg = _trapezoid(np.where(s >= threshold, 1 - prob, 0), s)
+            if false_pos + false_neg < best_error:
+                best, best_error = (bands, rows), false_pos + false_neg
+    return best
+
+class MinHasher:
+    """Signature MinHash (uint32) untuk banyak teks sekaligus, hash universal (a*x + b) mod p"""
+
+    def __init__(self, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=SEED):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, texts):
+        # crc32 (bukan hash() bawaan Python yang diacak per proses) supaya cluster sama antar run
+        hashed = [[zlib.crc32(s.encode('utf-8')) for s in shingles(text, self.shingle_size)] for text in texts]
+        counts = np.fromiter(map(len, hashed), dtype=np.int64, count=len(hashed))
+        values = np.fromiter((h for doc in hashed for h in doc), dtype=np.uint64, count=int(counts.sum()))
+
+        signatures = np.full((len(hashed), self.num_perm), _MAX_HASH, dtype=np.uint32)
+        ends = np.cumsum(counts)
+        starts = ends - counts
+        doc = 0
+        while doc < len(hashed):
+            # Ambil sebanyak mungkin dokumen yang total shingle-nya muat di satu blok
+            last = max(int(np.searchsorted(ends, starts[doc] + _HASH_BLOCK, side='right')), doc + 1)
+            lo, hi = starts[doc], ends[last - 1]
+            if hi > lo:
+                # Overflow uint64 disengaja (sama dengan implementasi MinHash umumnya)
+                with np.errstate(over='ignore'):
+                    block = (values[lo:hi, None] * self.a + self.b) % _MERSENNE_PRIME & _MAX_HASH
+                nonempty = np.flatnonzero(counts[doc:last]) + doc
+                signatures[nonempty] = np.minimum.reduceat(block, starts[nonempty] - lo, axis=0)
+            doc = last
+        return signatures
+
+class NearDuplicateIndex:
+    """
+    Index LSH yang diisi berurutan (bisa per chunk). Teks pertama dari sebuah cluster jadi
+    representatif; teks berikutnya masuk cluster itu bila estimasi Jaccard ke representatif
+    >= threshold. Cluster id = urutan representatif (0, 1, 2, ...), jadi sama dengan nomor baris
+    teks yang disimpan bila hanya representatif yang ditulis.
+    """
+
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=SEED):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        # Per band: key -> list representatif (satu key bisa dimiliki beberapa cluster)
+        self.buckets = [{} for _ in range(self.bands)]
+        # Pengali acak untuk meringkas r nilai per band jadi satu key uint64
+        self.band_mult = np.random.RandomState(seed + 1).randint(1, _MERSENNE_PRIME, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self.rep_signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self.n_clusters = 0
+
+    def band_keys(self, signatures):
+        bands = signatures[:, :self.bands * self.rows].astype(np.uint64).reshape(len(signatures), self.bands, self.rows)
+        with np.errstate(over='ignore'):
+            return (bands * self.band_mult).sum(axis=2, dtype=np.uint64)
+
+    def _add_representative(self, signature):
+        if self.n_clusters == len(self.rep_signatures):
+            grown = np.empty((2 * len(self.rep_signatures), self.hasher.num_perm), dtype=np.uint32)
+            grown[:self.n_clusters] = self.rep_signatures[:self.n_clusters]
+            self.rep_signatures = grown
+        self.rep_signatures[self.n_clusters] = signature
+        self.n_clusters += 1
+        return self.n_clusters - 1
+
+    def add(self, texts):
+        """
+        Proses teks berurutan. Mengembalikan (cluster_id, is_representative, similarity ke representatif)
+        sebagai array numpy sepanjang texts.
+        """
+        signatures = self.hasher.signatures(texts)
+        keys = self.band_keys(signatures).tolist()
+        cluster_ids = np.empty(len(texts), dtype=np.int64)
+        is_rep = np.zeros(len(texts), dtype=bool)
+        similarity = np.ones(len(texts), dtype=np.float64)
+        num_perm = self.hasher.num_perm
+
+        for i, doc_keys in enumerate(keys):
+            candidates = set()
+            for bucket, key in zip(self.buckets, doc_keys):
+                candidates.update(bucket.get(key, ()))
+
+            best, best_sim = -1, 0.0
+            for rep in candidates:
+                sim = np.count_nonzero(self.rep_signatures[rep] == signatures[i]) / num_perm
+                if sim > best_sim or (sim == best_sim and rep < best):
+                    best, best_sim = rep, sim
+
+            if best >= 0 and best_sim >= self.threshold:
+                cluster_ids[i] = best
+                similarity[i] = best_sim
+            else:
+                rep = self._add_representative(signatures[i])
+                for bucket, key in zip(self.buckets, doc_keys):
+                    bucket.setdefault(key, []).append(rep)
+                cluster_ids[i] = rep
+                is_rep[i] = True
+        return cluster_ids, is_rep, similarity
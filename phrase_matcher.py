@@ -0,0 +1,111 @@
+from collections import deque
+
+# ==========================================
+# PENCOCOKAN BANYAK FRASA SEKALIGUS (AHO-CORASICK)
+# ==========================================
+
+# Untuk kamus frasa kecil, str.find (C) per frasa masih lebih cepat dari automaton
+# yang berjalan per karakter di Python. Di atas batas ini automaton yang dipakai.
+DIRECT_SEARCH_MAX = 64
+
+class PhraseMatcher:
+    """Automaton Aho-Corasick: semua frasa dicari dalam satu kali jalan di teks"""
+
+    def __init__(self, phrases):
+        # Frasa unik sesuai urutan prioritas (kemunculan pertama di list menang)
+        self.phrases = []
+        self.index = {}
+
+        # State 0 = root. goto: transisi per karakter, fail: suffix link, out: id frasa yang selesai
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for phrase in phrases:
+            if not phrase or phrase in self.index: continue
+            self.index[phrase] = len(self.phrases)
+            self.phrases.append(phrase)
+            self._add(phrase, self.index[phrase])
+
+        self._build()
+
+    def _add(self, phrase, phrase_id):
+        state = 0
+        for char in phrase:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append(phrase_id)
+
+    def _build(self):
+        # BFS untuk mengisi suffix link dan menggabungkan output dari state fail
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                # Anak langsung dari root selalu fail ke root
+                self.fail[nxt] = self.goto[fail].get(char, 0) if state else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def find_all(self, text):
+        """Semua kemunculan frasa (termasuk yang overlap) sebagai list (start, end, phrase_id)"""
+        if len(self.phrases) <= DIRECT_SEARCH_MAX:
+            return self._find_all_direct(text)
+
+        goto, fail, out, phrases = self.goto, self.fail, self.out, self.phrases
+        matches = []
+        state = 0
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                end = pos + 1
+                for phrase_id in out[state]:
+                    matches.append((end - len(phrases[phrase_id]), end, phrase_id))
+        return matches
+
+    def _find_all_direct(self, text):
+        matches = []
+        for phrase_id, phrase in enumerate(self.phrases):
+            start = text.find(phrase)
+            while start != -1:
+                matches.append((start, start + len(phrase), phrase_id))
+                start = text.find(phrase, start + 1)
+        return matches
+
+    def remove_matches(self, text):
+        """
+        Setara dengan loop `if phrase in text: text = text.replace(phrase, "")`
+        untuk tiap frasa sesuai urutan prioritas.
+        Mengembalikan (list phrase_id yang ketemu, teks setelah frasa dihapus).
+        Teks tanpa frasa cukup dipindai sekali; teks yang mengandung k frasa dipindai k+1 kali.
+        """
+        found = []
+        last_id = -1
+        matches = self.find_all(text)
+        while True:
+            # Frasa berikutnya yang masih ada di teks saat ini (prioritas terkecil setelah last_id).
+            # Frasa di antaranya pasti tidak ada di teks, jadi loop replace juga akan melewatinya
+            next_id = min((phrase_id for _, _, phrase_id in matches if phrase_id > last_id), default=None)
+            if next_id is None: break
+
+            found.append(next_id)
+            last_id = next_id
+            text = text.replace(self.phrases[next_id], "")
+            # Scan ulang: penghapusan bisa membuang atau justru menyambung frasa lain
+            matches = self.find_all(text)
+
+        return found, text
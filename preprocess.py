@@ -1,69 +1,69 @@
-import pandas as pd
 import re
 import string
-from langdetect import detect, LangDetectException
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from metrics import metrics
+import lexicon_store
 # Pastikan install dulu: pip install Sastrawi
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+# pandas, langdetect & Sastrawi di-import saat dibutuhkan saja (lihat get_stemmer / get_stopwords),
+# supaya `import preprocess` untuk memproses satu teks tetap cepat
 
 # ==========================================
 # 1. KONFIGURASI SASTRAWI (STOPWORD & STEMMER)
 # ==========================================
 
-# "Menghapus kata umum dengan Sastrawi Factory + daftar manual interjeksi"
-factory_sw = StopWordRemoverFactory()
-stopword_sastrawi = factory_sw.get_stop_words()
-
 # Tambahan manual interjeksi/kata umum yang sering muncul di sosmed 
 manual_stopwords = [
     'sih', 'dong', 'kok', 'deh', 'tuh', 'nih', 'ya', 'yah', 'loh', 
     'kan', 'kek', 'lah', 'pun', 'mah', 'si', 'itu', 'ini', 'yang', 
     'dan', 'di', 'ke', 'dari', 'untuk', 'pada'
 ]
-# Gabungkan stopword (menggunakan set agar unik dan pencarian cepat)
-final_stopwords = set(stopword_sastrawi + manual_stopwords)
 
-# "Mengubah kata berimbuhan menjadi kata dasar"
-factory_stem = StemmerFactory()
-stemmer = factory_stem.create_stemmer()
+_final_stopwords = None
+_stemmer = None
+
+def get_stopwords():
+    """Menghapus kata umum dengan Sastrawi Factory + daftar manual interjeksi (dibuat sekali)"""
+    global _final_stopwords
+    if _final_stopwords is None:
+        from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+        stopword_sastrawi = StopWordRemoverFactory().get_stop_words()
+        # Gabungkan stopword (menggunakan set agar unik dan pencarian cepat)
+        _final_stopwords = set(stopword_sastrawi + manual_stopwords)
+    return _final_stopwords
+
+def get_stemmer():
+    """Mengubah kata berimbuhan menjadi kata dasar (stemmer Sastrawi dibuat sekali)"""
+    global _stemmer
+    if _stemmer is None:
+        from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+        _stemmer = StemmerFactory().create_stemmer()
+    return _stemmer
+
+def __getattr__(name):
+    # Kompatibilitas: preprocess.stemmer & preprocess.final_stopwords tetap bisa diakses
+    if name == 'stemmer': return get_stemmer()
+    if name == 'final_stopwords': return get_stopwords()
+    if name == 'kamus_slang': return get_slang()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# File cache stem per kata, dipakai ulang antar run / batch baru
+STEM_CACHE_FILE = 'stem_cache.json'
+STEM_CACHE_MAXSIZE = 200_000
 
 # ==========================================
 # 2. DEFINISI KAMUS SINGKATAN
 # ==========================================
-kamus_slang = {
-    'yg': 'yang', 'y': 'ya', 'klo': 'kalau', 'tp': 'tapi', 'tpi': 'tapi',
-    'tak': 'tidak', 'gak': 'tidak', 'ga': 'tidak', 'gk': 'tidak', 'nggak': 'tidak',
-    'sdh': 'sudah', 'udh': 'sudah', 'dah': 'sudah',
-    'dgn': 'dengan', 'krn': 'karena', 'karna': 'karena',
-    'utk': 'untuk', 'unt': 'untuk',
-    'bgt': 'banget', 'bngit': 'banget',
-    'dlm': 'dalam', 'dr': 'dari',
-    'jgn': 'jangan', 'tdk': 'tidak',
-    'jd': 'jadi', 'jdi': 'jadi',
-    'aja': 'saja', 'aj': 'saja',
-    'krja': 'kerja', 'blm': 'belum',
-    'bnyk': 'banyak', 'bnyak': 'banyak',
-    'tmn': 'teman', 'org': 'orang',
-    'mnrt': 'menurut', 'dpt': 'dapat',
-    'pke': 'pakai', 'pake': 'pakai',
-    'sm': 'sama', 'smua': 'semua',
-    'nnti': 'nanti', 'ntar': 'nanti',
-    'bs': 'bisa', 'bsa': 'bisa',
-    'ak': 'aku', 'aq': 'aku', 'gw': 'aku', 'gue': 'aku', 'sy': 'saya',
-    'km': 'kamu', 'lu': 'kamu', 'loe': 'kamu',
-    'knp': 'kenapa', 'np': 'kenapa',
-    'gini': 'begini', 'gitu': 'begitu',
-    'kpn': 'kapan', 'dmn': 'dimana',
-    'jg': 'juga', 'jga': 'juga',
-    'mkn': 'makan', 'mkan': 'makan',
-    'lbh': 'lebih', 'kurleb': 'kurang lebih',
-    'skrg': 'sekarang', 'trus': 'terus',
-    'bgmn': 'bagaimana', 'gmn': 'bagaimana',
-    'dtg': 'datang', 'tuh': 'itu', 'ni': 'ini',
-    'ok': 'oke', 'oke': 'oke', 'sip': 'siap',
-    'thn': 'tahun', 'bln': 'bulan', 'mgu': 'minggu',
-    'bgs': 'bagus', 'jlk': 'jelek', 'parah': 'buruk',
-}
+# Kamus slang ada di lexicon.json (bagian "slang"), ikut versi & hot reload lexicon_store.py.
+# preprocess.kamus_slang tetap bisa dibaca (lihat __getattr__ di atas).
+
+def get_slang():
+    """Kamus slang -> kata baku dari versi lexicon yang sedang aktif"""
+    return lexicon_store.get_compiled().slang
 
 # ==========================================
 # 3. FUNGSI PREPROCESSING (PIPELINE)
@@ -85,6 +85,7 @@ def normalize_slang(text):
     """Tahap 2: Normalisasi Slang (PPT Source 88)"""
     if not text: return ""
     words = text.split()
+    kamus_slang = get_slang()
     normalized_words = [kamus_slang.get(word, word) for word in words]
     return " ".join(normalized_words)
 
@@ -93,29 +94,192 @@ def remove_stopwords(text):
     if not text: return ""
     words = text.split()
     # Hapus kata jika ada di set stopword
+    final_stopwords = get_stopwords()
     filtered_words = [word for word in words if word not in final_stopwords]
     return " ".join(filtered_words)
 
+# --- Tahap 1-3 dalam satu pass (hasil identik dengan clean_regex -> normalize_slang -> remove_stopwords) ---
+# Satu regex gabungan menggantikan 4x re.sub + translate. Mention/hashtag berhenti tepat sebelum
+# posisi yang cocok dengan pola URL, karena di clean_regex URL sudah dihapus lebih dulu.
+_not_url = r'(?!http\S|www\S)'
+_fused_pattern = re.compile(
+    r'http\S+|www\S+'                    # URL (https\S+ sudah tercakup http\S+)
+    r'|@(?:' + _not_url + r'\w)+'         # Mention
+    r'|#(?:' + _not_url + r'\w)+'         # Hashtag
+    r'|\d+'                               # Angka
+    r'|[' + re.escape(string.punctuation) + r']'  # Tanda baca
+)
+
+# (kamus slang, kata yang dibuang, slang -> hasil): dibangun ulang kalau versi slang berganti
+_fused_tables = None
+
+def _get_fused_tables():
+    """(kata yang dibuang, slang -> hasil setelah stopword) untuk satu kali jalan per token"""
+    global _fused_tables
+    kamus_slang = get_slang()
+    tables = _fused_tables
+    if tables is None or tables[0] is not kamus_slang:
+        final_stopwords = get_stopwords()
+        slang_out = {}
+        for word, normal in kamus_slang.items():
+            # Slang bisa jadi lebih dari satu kata (mis. 'kurleb' -> 'kurang lebih')
+            slang_out[word] = " ".join(w for w in normal.split() if w not in final_stopwords)
+        drop = {w for w in final_stopwords if w not in slang_out}
+        drop.update(w for w, out in slang_out.items() if not out)
+        tables = _fused_tables = (kamus_slang, drop, {w: out for w, out in slang_out.items() if out})
+    return tables[1:]
+
+def normalize_fused(text):
+    """Tahap 1-3 digabung: satu regex gabungan + satu kali jalan per token (slang & stopword sekaligus)"""
+    if not isinstance(text, str): return ""
+    drop, slang = _get_fused_tables()
+    words = _fused_pattern.sub('', text.lower()).split()
+    return " ".join([slang.get(word, word) for word in words if word not in drop])
+
+# Salinan TextNormalizer.normalize_text milik Sastrawi (regex sama, flag sama),
+# di-compile di sini agar tidak perlu import Sastrawi hanya untuk normalisasi
+_stem_non_alnum = re.compile(r'[^a-z0-9 -]', flags=re.IGNORECASE | re.MULTILINE)
+_stem_spaces = re.compile(r'( +)', flags=re.IGNORECASE | re.MULTILINE)
+
+def normalize_stem_text(text):
+    result = str.lower(text)
+    result = _stem_non_alnum.sub(' ', result)
+    result = _stem_spaces.sub(' ', result)
+    return result.strip()
+
+class StemCache:
+    """Cache stem per kata (LRU, ukuran terbatas) yang bisa disimpan ke disk"""
+
+    def __init__(self, base_stemmer=None, maxsize=STEM_CACHE_MAXSIZE):
+        # Pakai stemmer asli di balik CachedStemmer Sastrawi,
+        # karena cache bawaan Sastrawi tidak punya batas ukuran.
+        # Jika None, stemmer baru dibuat saat kata pertama perlu di-stem
+        self.base_stemmer = getattr(base_stemmer, 'delegatedStemmer', base_stemmer)
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Kata baru sejak drain_new() terakhir (dipakai worker paralel), None = tidak dicatat
+        self.new_words = None
+        # OrderedDict LRU tidak aman diubah dari beberapa thread sekaligus (mis. scoring_service:
+        # thread batcher + compile lexicon di thread request / watcher), jadi stem() dkk. memegang lock
+        self._lock = threading.Lock()
+
+    def stem_word(self, word):
+        if word in self.cache:
+            self.cache.move_to_end(word)
+            self.hits += 1
+            return self.cache[word]
+
+        self.misses += 1
+        if self.base_stemmer is None:
+            stemmer = get_stemmer()
+            self.base_stemmer = getattr(stemmer, 'delegatedStemmer', stemmer)
+        result = self.base_stemmer.stem(word)
+        self.cache[word] = result
+        if self.new_words is not None: self.new_words[word] = result
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False) # Buang kata yang paling lama tidak dipakai
+        return result
+
+    def stem(self, text):
+        # Sama persis dengan CachedStemmer.stem milik Sastrawi (normalisasi lalu per kata)
+        normalized = normalize_stem_text(text)
+        with self._lock:
+            return ' '.join([self.stem_word(word) for word in normalized.split(' ')])
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self.cache),
+        }
+
+    def drain_new(self):
+        new_words, self.new_words = self.new_words or {}, {}
+        return new_words
+
+    def update(self, words):
+        """Gabungkan hasil stem dari worker lain ke cache ini"""
+        with self._lock:
+            for word, result in words.items():
+                self.cache[word] = result
+                self.cache.move_to_end(word)
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+
+    def save(self, path=STEM_CACHE_FILE):
+        # Disimpan urut dari yang paling lama dipakai -> paling baru (urutan LRU tetap)
+        with self._lock:
+            items = list(self.cache.items())
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(items, f, ensure_ascii=False)
+
+    def load(self, path=STEM_CACHE_FILE):
+        if not os.path.exists(path): return 0
+        with open(path, encoding='utf-8') as f:
+            items = json.load(f)
+        self.update(dict(items))
+        return len(self.cache)
+
+stem_cache = StemCache()
+
 def stemming_text(text):
     """Tahap 4: Stemming (PPT Source 90)"""
     # Mengubah kata berimbuhan jadi kata dasar
-    # Warning: Proses ini biasanya memakan waktu paling lama
+    # Warning: Proses ini biasanya memakan waktu paling lama,
+    # jadi hasil stem per kata disimpan di stem_cache
     if not text: return ""
-    return stemmer.stem(text)
+    return stem_cache.stem(text)
 
 # ==========================================
 # 4. FUNGSI FILTERING (VALIDASI)
 # ==========================================
-# Fungsi ini tetap ada tapi tidak akan dipanggil di main()
+
+_vowel = re.compile(r'[aiueoAIUEO]')
+_repeated_char = re.compile(r'(.)\1{4,}')
+
+# Seed langdetect dikunci agar hasil deteksi selalu sama antar run
+LANGDETECT_SEED = 0
+LANG_CACHE_MAXSIZE = 500_000
+
+# Cache hasil deteksi bahasa, key = hash teks yang sudah dinormalisasi
+_lang_cache = OrderedDict()
+lang_cache_stats = {'hits': 0, 'misses': 0}
 
 def is_gibberish(text):
     """Cek kata asal-asalan"""
-    if not re.search(r'[aiueoAIUEO]', text): return True
-    if re.search(r'(.)\1{4,}', text): return True
+    if not _vowel.search(text): return True
+    if _repeated_char.search(text): return True
     return False
 
+def detect_language(text):
+    """langdetect.detect dengan cache per teks (None jika bahasa tidak terdeteksi)"""
+    normalized = " ".join(text.lower().split())
+    key = hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+    if key in _lang_cache:
+        _lang_cache.move_to_end(key)
+        lang_cache_stats['hits'] += 1
+        return _lang_cache[key]
+
+    lang_cache_stats['misses'] += 1
+    from langdetect import DetectorFactory, detect, LangDetectException
+    DetectorFactory.seed = LANGDETECT_SEED
+    try:
+        lang = detect(normalized)
+    except LangDetectException:
+        lang = None
+
+    _lang_cache[key] = lang
+    if len(_lang_cache) > LANG_CACHE_MAXSIZE:
+        _lang_cache.popitem(last=False)
+    return lang
+
 def is_valid_content(text):
     """Tahap 5: Validasi Akhir"""
+    # Cek murah dulu, deteksi bahasa (mahal) hanya untuk teks yang lolos
     if not isinstance(text, str) or not text.strip(): return False
     
     words = text.split()
@@ -124,23 +288,117 @@ def is_valid_content(text):
     if is_gibberish(text): return False
     
     # Cek Bahasa
-    try:
-        if detect(text) != 'id': return False
-    except LangDetectException:
-        return False
-        
-    return True
+    return detect_language(text) == 'id'
+
+# ==========================================
+# 5. EKSEKUSI PARALEL (MULTI-CORE)
+# ==========================================
+
+PARALLEL_CHUNKSIZE = 2000
+
+def preprocess_text(text):
+    """Tahap 1-4 digabung untuk satu teks (tanpa kolom perantara)"""
+    return stemming_text(normalize_fused(text))
+
+def _init_worker(cache_file):
+    """Dijalankan sekali per proses worker: siapkan stemmer, stopword & cache stem"""
+    global stem_cache
+    get_stopwords()
+    stem_cache = StemCache(get_stemmer())
+    if cache_file: stem_cache.load(cache_file)
+    stem_cache.new_words = {}
+
+def _process_chunk(texts, filter_valid=False):
+    hits, misses = stem_cache.hits, stem_cache.misses
+    lang_hits, lang_misses = lang_cache_stats['hits'], lang_cache_stats['misses']
+    results = [preprocess_text(text) for text in texts]
+    # Tahap 5 (validasi + deteksi bahasa) ikut dijalankan di worker yang sama
+    valid = [is_valid_content(text) for text in results] if filter_valid else None
+    return {
+        'results': results,
+        'valid': valid,
+        'new_words': stem_cache.drain_new(),
+        'stem_hits': stem_cache.hits - hits,
+        'stem_misses': stem_cache.misses - misses,
+        'lang_hits': lang_cache_stats['hits'] - lang_hits,
+        'lang_misses': lang_cache_stats['misses'] - lang_misses,
+    }
+
+def run_pipeline_parallel(texts, workers=None, chunksize=PARALLEL_CHUNKSIZE, cache_file=STEM_CACHE_FILE,
+                          filter_valid=False):
+    """
+    Jalankan Tahap 1-4 per potongan data di process pool, urutan hasil tetap sama.
+    Jika filter_valid=True, mengembalikan (hasil, list bool is_valid_content per teks).
+    """
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    # Pastikan artifact lexicon (slang) sudah ada sebelum worker dibuat, supaya worker cukup load
+    lexicon_store.get_compiled()
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+
+    results = []
+    valid = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_file,)) as executor:
+        # executor.map mengembalikan hasil sesuai urutan chunk
+        for chunk in executor.map(_process_chunk, chunks, [filter_valid] * len(chunks)):
+            results.extend(chunk['results'])
+            if filter_valid: valid.extend(chunk['valid'])
+            # Kata baru dari worker digabung ke cache utama agar ikut tersimpan
+            stem_cache.update(chunk['new_words'])
+            stem_cache.hits += chunk['stem_hits']
+            stem_cache.misses += chunk['stem_misses']
+            lang_cache_stats['hits'] += chunk['lang_hits']
+            lang_cache_stats['misses'] += chunk['lang_misses']
+    return (results, valid) if filter_valid else results
 
 # ==========================================
-# 5. EKSEKUSI UTAMA
+# 6. MICRO-BENCHMARK NORMALIZER
 # ==========================================
 
-def main():
-    output_file = 'data_final_preprocessing_no_filter.csv'
+def benchmark_normalizer(input_file="dataset_raw.csv", col_text='full_text', repeats=5):
+    """Bandingkan clean_regex -> normalize_slang -> remove_stopwords dengan normalize_fused"""
+    import time
+    from storage import load_table
+
+    texts = load_table(input_file, columns=[col_text])[col_text].tolist()
+    get_stopwords()
+    _get_fused_tables()
+
+    def run(func):
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results = [func(text) for text in texts]
+            best = min(best, time.perf_counter() - start)
+        return results, best
+
+    chain, chain_time = run(lambda text: remove_stopwords(normalize_slang(clean_regex(text))))
+    fused, fused_time = run(normalize_fused)
+    mismatch = sum(a != b for a, b in zip(chain, fused))
+
+    print(f"Benchmark normalizer: {len(texts)} teks dari {input_file} (terbaik dari {repeats}x)")
+    print(f"   3 tahap terpisah : {chain_time * 1000:.1f} ms ({chain_time / len(texts) * 1e6:.1f} µs/teks)")
+    print(f"   normalize_fused  : {fused_time * 1000:.1f} ms ({fused_time / len(texts) * 1e6:.1f} µs/teks)")
+    print(f"   Speedup          : {chain_time / fused_time:.2f}x, hasil berbeda: {mismatch}")
+    return {'n': len(texts), 'chain_s': chain_time, 'fused_s': fused_time, 'mismatch': mismatch}
+
+# ==========================================
+# 7. EKSEKUSI UTAMA
+# ==========================================
+
+def main(workers=1, input_file="dataset_sentimen - raw.csv", output_file=None, filter_valid=True):
+    # Input/output boleh .csv atau .parquet (lihat storage.py)
+    from storage import load_table, save_table
+    
+    if output_file is None:
+        output_file = 'data_final_preprocessing.csv' if filter_valid else 'data_final_preprocessing_no_filter.csv'
     
     print(f"Membaca data...")
     try:
-        df = pd.read_csv("dataset_sentimen - raw.csv")
+        with metrics.stage('load') as stage:
+            df = load_table(input_file)
+            stage.add_rows(len(df))
+        metrics.count('rows_in', len(df))
         # Deteksi nama kolom teks
         col_text = next((col for col in df.columns if any(x in col.lower() for x in ['text', 'content', 'caption', 'cleaned'])), df.columns[0])
         print(f"Menggunakan kolom teks: {col_text}")
@@ -149,26 +407,50 @@ def main():
         print(f"Total data awal: {len(df)}")
         
         
-        # 1. Cleaning
-        print("1. Melakukan Cleaning Regex (Hapus URL, Emoji, dll)...")
-        df['step1_clean'] = df[col_text].apply(clean_regex)
-        
-        # 2. Normalisasi Slang
-        print("2. Melakukan Normalisasi Slang...")
-        df['step2_normal'] = df['step1_clean'].apply(normalize_slang)
-        
-        # 3. Stopword Removal 
-        print("3. Melakukan Stopword Removal (Sastrawi + Manual)...")
-        df['step3_stopword'] = df['step2_normal'].apply(remove_stopwords)
+        with metrics.stage('stem_cache_load'):
+            loaded = stem_cache.load(STEM_CACHE_FILE)
+        print(f"Cache stem dimuat: {loaded} kata")
         
-        # 4. Stemming
-        print("4. Melakukan Stemming (Sastrawi) - Proses ini mungkin agak lama...")
-        df['step4_stemmed'] = df['step3_stopword'].apply(stemming_text)
+        if workers > 1:
+            # Tahap 1-4 digabung dan dijalankan paralel per potongan data
+            print(f"1-4. Cleaning, Slang, Stopword & Stemming paralel ({workers} worker)...")
+            with metrics.stage('preprocess_parallel', rows=len(df)):
+                if filter_valid:
+                    print("5. Validasi konten & deteksi bahasa ikut di worker paralel...")
+                    df['step4_stemmed'], mask_valid = run_pipeline_parallel(df[col_text], workers=workers, filter_valid=True)
+                else:
+                    df['step4_stemmed'] = run_pipeline_parallel(df[col_text], workers=workers)
+        else:
+            # 1-3. Cleaning, Slang & Stopword dalam satu pass (hasil sama dengan 3 tahap terpisah)
+            print("1-3. Cleaning Regex, Normalisasi Slang & Stopword Removal (satu pass)...")
+            with metrics.stage('normalize_fused', rows=len(df)):
+                df['step3_stopword'] = df[col_text].apply(normalize_fused)
+            
+            # 4. Stemming
+            print("4. Melakukan Stemming (Sastrawi) - Proses ini mungkin agak lama...")
+            with metrics.stage('stemming_text', rows=len(df)):
+                df['step4_stemmed'] = df['step3_stopword'].apply(stemming_text)
+            
+            if filter_valid:
+                # 5. Validasi (kata < 3, gibberish, bukan Bahasa Indonesia)
+                print("5. Validasi konten & deteksi bahasa (Indonesia saja)...")
+                with metrics.stage('is_valid_content', rows=len(df)):
+                    mask_valid = df['step4_stemmed'].apply(is_valid_content).tolist()
         
-        # mask_valid = df['step4_stemmed'].apply(is_valid_content)
-        # df_final = df[mask_valid].copy()
+        with metrics.stage('stem_cache_save'):
+            stem_cache.save(STEM_CACHE_FILE)
+        stats = stem_cache.stats()
+        metrics.cache('stem', stats['hits'], stats['misses'], stats['size'])
+        print(f"   Cache stem: {stats['hits']} hit, {stats['misses']} miss ({stats['hit_rate']:.1%})")
         
-        df_final = df.copy()
+        if filter_valid:
+            df_final = df[mask_valid].copy()
+            print(f"   Data tidak valid / bukan Bahasa Indonesia dibuang: {len(df) - len(df_final)}")
+            print(f"   Cache bahasa: {lang_cache_stats['hits']} hit, {lang_cache_stats['misses']} miss")
+            metrics.dropped('invalid_content', len(df) - len(df_final))
+            metrics.cache('lang', lang_cache_stats['hits'], lang_cache_stats['misses'], len(_lang_cache))
+        else:
+            df_final = df.copy()
         
         # --- SIMPAN HASIL ---
         # Simpan kolom hasil akhir sebagai 'processed_text'
@@ -180,7 +462,9 @@ def main():
             
         print(f"Total data disimpan: {len(df_final)}")
         
-        df_final[cols_to_save].to_csv(output_file, index=False)
+        with metrics.stage('save', rows=len(df_final)):
+            save_table(df_final[cols_to_save], output_file)
+        metrics.count('rows_out', len(df_final))
         
         print("\n" + "="*40)
         print("PROSES SELESAI!")
@@ -197,5 +481,22 @@ def main():
         print(f"Terjadi error: {e}")
 
 if __name__ == "__main__":
+    import argparse
+    from metrics import add_arguments as add_metrics_arguments, enable_from_args as enable_metrics
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=1, help="Jumlah proses paralel (0 = semua core)")
+    parser.add_argument('--input', default="dataset_sentimen - raw.csv", help="File input (.csv / .parquet)")
+    parser.add_argument('--output', default=None, help="File output (.csv / .parquet)")
+    parser.add_argument('--no-filter', action='store_true', help="Lewati validasi konten & filter bahasa")
+    parser.add_argument('--bench-normalizer', action='store_true',
+                        help="Micro-benchmark normalize_fused vs 3 tahap terpisah (pakai --input, default dataset_raw.csv)")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    enable_metrics(args)
+
+    if args.bench_normalizer:
+        benchmark_normalizer(args.input if args.input != parser.get_default('input') else "dataset_raw.csv")
+        raise SystemExit
 
-    main()
+    main(workers=args.workers or os.cpu_count(), input_file=args.input, output_file=args.output,
+         filter_valid=not args.no_filter)
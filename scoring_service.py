@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import queue
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import preprocess
+import sentimen
+import lexicon_store
+from metrics import metrics
+
+# ==========================================
+# 1. KONFIGURASI
+# ==========================================
+# Service scoring lokal: pipeline preprocess, lexicon hasil stemming (dan opsional IndoBERT)
+# dimuat sekali, lalu request yang datang bersamaan digabung jadi micro-batch.
+#
+#   python scoring_service.py --port 8008
+#   python scoring_service.py --unix /tmp/sentimen.sock --bert-dir indobert-sentimen-onnx
+#
+#   curl -s localhost:8008/score -d '{"text": "program mbg sangat membantu"}'
+#   curl -s localhost:8008/score -d '{"texts": ["mbg enak", "makanan basi"]}'
+#   curl -s localhost:8008/score -d '{"texts": ["makan gratis bantu"], "preprocessed": true}'
+#   curl -s -X POST localhost:8008/reload-lexicon       # pakai lexicon.json terbaru tanpa restart
+
+HOST = "127.0.0.1"
+PORT = 8008
+
+# Batch ditutup saat berisi MAX_BATCH teks atau MAX_WAIT detik sejak request pertama masuk
+MAX_BATCH = 256
+MAX_WAIT = 0.005
+
+# Batas ukuran body request (byte)
+MAX_BODY = 10 * 1024 * 1024
+
+# Antrean koneksi listen(); default socketserver (5) terlalu kecil untuk banyak klien bersamaan
+LISTEN_BACKLOG = 128
+
+# ==========================================
+# 2. MICRO-BATCHER
+# ==========================================
+
+class _Pending:
+    __slots__ = ('texts', 'options', 'done', 'result', 'error')
+
+    def __init__(self, texts, options):
+        self.texts = texts
+        self.options = options
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class MicroBatcher:
+    """
+    Satu thread worker mengumpulkan request dari banyak thread HTTP, lalu memanggil
+    process(texts, options) sekali per batch. Request dengan opsi berbeda tidak dicampur.
+    """
+
+    def __init__(self, process, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.process = process
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.stats = {'batches': 0, 'texts': 0, 'requests': 0}
+        self._thread = threading.Thread(target=self._run, name="sentimen-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts, options=()):
+        """Dipanggil dari thread request; blok sampai hasil batch-nya selesai"""
+        pending = _Pending(texts, tuple(sorted(options)))
+        self.queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None: raise pending.error
+        return pending.result
+
+    def _collect(self):
+        first = self.queue.get()
+        batch, size = [first], len(first.texts)
+        deadline = time.perf_counter() + self.max_wait
+        held = []
+        while size < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0: break
+            try:
+                pending = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if pending.options != first.options or size + len(pending.texts) > self.max_batch:
+                held.append(pending)
+                continue
+            batch.append(pending)
+            size += len(pending.texts)
+        # Request yang tidak masuk batch ini dikembalikan ke antrean untuk batch berikutnya
+        for pending in held: self.queue.put(pending)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for pending in batch for text in pending.texts]
+            try:
+                with metrics.stage('serve_batch', rows=len(texts)):
+                    results = self.process(texts, dict(batch[0].options))
+                pos = 0
+                for pending in batch:
+                    pending.result = results[pos:pos + len(pending.texts)]
+                    pos += len(pending.texts)
+            except Exception as e:
+                for pending in batch: pending.error = e
+            self.stats['batches'] += 1
+            self.stats['texts'] += len(texts)
+            self.stats['requests'] += len(batch)
+            for pending in batch: pending.done.set()
+
+# ==========================================
+# 3. SCORER (DIMUAT SEKALI)
+# ==========================================
+
+class Scorer:
+    """Pipeline preprocess + scoring lexicon (+ IndoBERT bila ada) yang tetap hangat di memori"""
+
+    def __init__(self, bert_dir=None, bert_backend='auto', stem_cache_file=preprocess.STEM_CACHE_FILE):
+        self.stem_cache_file = stem_cache_file
+        preprocess.get_stopwords()
+        preprocess.get_stemmer()
+        if stem_cache_file: preprocess.stem_cache.load(stem_cache_file)
+        sentimen.get_lexicon()
+
+        self.predictor = None
+        if bert_dir:
+            from indobert_infer import load_predictor
+            self.predictor = load_predictor(bert_dir, bert_backend)
+
+        # Pemanasan: jalur pertama (regex, automaton, model) sudah terpanggil sebelum request masuk
+        self.score(["program mbg membantu anak sekolah"], {})
+
+    def score(self, texts, options):
+        if options.get('preprocessed'):
+            processed = ["" if text is None else str(text) for text in texts]
+        else:
+            processed = [preprocess.preprocess_text(text) for text in texts]
+
+        lexicon = sentimen.score_batch(processed)
+        results = [
+            {'processed_text': text, 'label': str(label), 'score': int(score)}
+            for text, label, score in zip(processed, lexicon['label'], lexicon['score'])
+        ]
+
+        if self.predictor is not None and options.get('bert', True):
+            labels, confidence = self.predictor.predict(processed)
+            for result, label, conf in zip(results, labels, confidence):
+                result['label_bert'] = label
+                result['confidence_bert'] = float(conf)
+        return results
+
+    def save_cache(self):
+        if self.stem_cache_file: preprocess.stem_cache.save(self.stem_cache_file)
+
+# ==========================================
+# 4. HTTP SERVER
+# ==========================================
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    server_version = "SentimenMBG/1.0"
+    batcher = None
+    scorer = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self._send_json(404, {'error': 'not found'})
+        stats = dict(self.batcher.stats)
+        stats['avg_batch'] = stats['texts'] / stats['batches'] if stats['batches'] else 0.0
+        compiled = lexicon_store.get_compiled()
+        self._send_json(200, {
+            'status': 'ok',
+            'lexicon': {'version': compiled.version, 'hash': compiled.hash[:16]},
+            'bert': self.scorer.predictor is not None,
+            'batcher': stats,
+            'stem_cache': preprocess.stem_cache.stats(),
+        })
+
+    def do_POST(self):
+        if self.path == '/reload-lexicon':
+            return self._reload_lexicon()
+        if self.path != '/score':
+            return self._send_json(404, {'error': 'not found'})
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            return self._send_json(400, {'error': 'Content-Length tidak valid'})
+        if length > MAX_BODY:
+            return self._send_json(413, {'error': 'body terlalu besar'})
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send_json(400, {'error': 'body harus JSON'})
+        if not isinstance(payload, dict):
+            return self._send_json(400, {'error': 'body harus objek JSON'})
+
+        single = 'text' in payload
+        texts = [payload['text']] if single else payload.get('texts')
+        if not isinstance(texts, list) or not all(t is None or isinstance(t, str) for t in texts):
+            return self._send_json(400, {'error': 'isi "text" (string) atau "texts" (list string)'})
+
+        options = {'preprocessed': bool(payload.get('preprocessed', False)), 'bert': bool(payload.get('bert', True))}
+        start = time.perf_counter()
+        try:
+            results = self.batcher.submit(texts, options.items()) if texts else []
+        except Exception as e:
+            return self._send_json(500, {'error': str(e)})
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        metrics.count('serve_texts', len(texts))
+
+        if single:
+            self._send_json(200, {**results[0], 'elapsed_ms': elapsed_ms})
+        else:
+            self._send_json(200, {'results': results, 'elapsed_ms': elapsed_ms})
+
+    def _reload_lexicon(self):
+        # Versi baru disiapkan di thread request ini (stem_cache aman dipakai bersama, lihat StemCache);
+        # batch yang sedang jalan tetap memakai versi lama
+        try:
+            changed = lexicon_store.store.reload()
+        except (OSError, ValueError) as e:
+            return self._send_json(400, {'error': str(e)})
+        compiled = lexicon_store.get_compiled()
+        self._send_json(200, {'changed': changed, 'version': compiled.version, 'hash': compiled.hash[:16]})
+
+    def address_string(self):
+        # Unix socket tidak punya alamat (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        pass
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    request_queue_size = LISTEN_BACKLOG
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "unix", 0
+
+def make_server(scorer, host=HOST, port=PORT, unix_socket=None, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+    handler = type('BoundScoringHandler', (ScoringHandler,), {
+        'scorer': scorer,
+        'batcher': MicroBatcher(scorer.score, max_batch, max_wait),
+    })
+    if unix_socket:
+        if os.path.exists(unix_socket): os.remove(unix_socket)
+        return ThreadingUnixHTTPServer(unix_socket, handler)
+    return ScoringHTTPServer((host, port), handler)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Service HTTP lokal untuk scoring sentimen")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--unix', default=None, help="Path Unix socket (pengganti host/port)")
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT * 1000)
+    parser.add_argument('--bert-dir', default=None, help="Folder model IndoBERT (fp32 / int8 / ONNX)")
+    parser.add_argument('--bert-backend', default='auto')
+    parser.add_argument('--watch-lexicon', type=float, default=None, metavar='DETIK',
+                        help="Cek perubahan lexicon.json tiap N detik dan reload otomatis")
+    args = parser.parse_args()
+
+    print("🔄 Memuat stopword, stemmer, cache stem & lexicon...")
+    scorer = Scorer(args.bert_dir, args.bert_backend)
+    server = make_server(scorer, args.host, args.port, args.unix, args.max_batch, args.max_wait_ms / 1000)
+    if args.watch_lexicon: lexicon_store.store.watch(args.watch_lexicon)
+    print(f"🚀 Siap di {args.unix or f'http://{args.host}:{args.port}'} (POST /score, POST /reload-lexicon, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        scorer.save_cache()
+        if args.unix and os.path.exists(args.unix): os.remove(args.unix)
+        print("\n💾 Cache stem disimpan, service berhenti.")
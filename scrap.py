@@ -8,22 +8,33 @@ until_date = "2025-11-17"
 limit = "700"
 auth_token = "ini diisi token auth cookies login twitter akun kalian"
 
-query = f"{search_keyword} since:{since_date} until:{until_date} lang:id"
-command = [
-    "npx", "-y", "tweet-harvest@2.6.1",
-    "-o", filename,
-    "-s", query,
-    "--tab", "LATEST",
-    "-l", limit,
-    "--token", auth_token
-]
+# tweet-harvest menulis hasilnya ke folder ini (tweets-data/<filename>)
+OUTPUT_DIR = "tweets-data"
 
-print("\nSedang melakukan scraping data dari Twitter/X...\n")
-try:
-    subprocess.run(command, check=True)
-    print(f"[{datetime.now()}] Selesai! Hasil tersimpan di: {filename}")
-except subprocess.CalledProcessError as e:
-    print(f"[{datetime.now()}] Terjadi kesalahan saat scraping.")
+def build_query(search_keyword, since_date, until_date):
+    return f"{search_keyword} since:{since_date} until:{until_date} lang:id"
 
-from google.colab import files
-files.download("tweets-data/hasil_ledakan.csv")
\ No newline at end of file
+def build_command(filename, query, limit, auth_token):
+    return [
+        "npx", "-y", "tweet-harvest@2.6.1",
+        "-o", filename,
+        "-s", query,
+        "--tab", "LATEST",
+        "-l", str(limit),
+        "--token", auth_token
+    ]
+
+# Untuk rentang tanggal panjang (banyak window paralel + retry), pakai scrape_orchestrator.py
+if __name__ == "__main__":
+    query = build_query(search_keyword, since_date, until_date)
+    command = build_command(filename, query, limit, auth_token)
+
+    print("\nSedang melakukan scraping data dari Twitter/X...\n")
+    try:
+        subprocess.run(command, check=True)
+        print(f"[{datetime.now()}] Selesai! Hasil tersimpan di: {filename}")
+    except subprocess.CalledProcessError as e:
+        print(f"[{datetime.now()}] Terjadi kesalahan saat scraping.")
+
+    from google.colab import files
+    files.download("tweets-data/hasil_ledakan.csv")
\ No newline at end of file
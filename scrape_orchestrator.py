@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import random
+import shlex
+import asyncio
+from datetime import date, datetime, timedelta
+
+import scrap
+
+# ==========================================
+# 1. KONFIGURASI
+# ==========================================
+# Rentang tanggal panjang dipecah jadi window (mis. per hari), tiap window satu proses tweet-harvest.
+# Beberapa window jalan bersamaan (asyncio), window yang gagal diulang dengan backoff,
+# window yang selesai dicatat di checkpoint supaya run berikutnya tidak mengulang.
+#
+# Contoh:
+#   python scrape_orchestrator.py --since 2025-09-01 --until 2025-11-17 --concurrency 3
+#   python scrape_orchestrator.py ... --harvester "python fake_harvester.py --out {path} --query {query}"
+
+KEYWORD = scrap.search_keyword
+SINCE_DATE = scrap.since_date
+UNTIL_DATE = scrap.until_date
+LIMIT_PER_WINDOW = 700
+WINDOW_DAYS = 1
+
+CONCURRENCY = 3
+RETRIES = 3
+BACKOFF_BASE = 30   # detik, dikali 2 tiap percobaan ulang (+ jitter)
+TIMEOUT = 30 * 60   # detik per window
+
+OUTPUT_DIR = scrap.OUTPUT_DIR
+CHECKPOINT_FILE = "scrape_checkpoint.json"
+# Bukan dataset_raw.csv: file raw yang sudah ada tidak ikut tertimpa (pakai --merged untuk memilih)
+MERGED_FILE = "dataset_raw_merged.csv"
+
+# Token login diambil dari environment agar tidak tertulis di file / riwayat shell
+TOKEN_ENV = "TWITTER_AUTH_TOKEN"
+
+# ==========================================
+# 2. WINDOW & PERINTAH HARVESTER
+# ==========================================
+
+def make_windows(since_date, until_date, window_days=WINDOW_DAYS):
+    """[(since, until), ...] string YYYY-MM-DD; until eksklusif seperti operator until: di X"""
+    start = date.fromisoformat(since_date)
+    end = date.fromisoformat(until_date)
+    windows = []
+    while start < end:
+        stop = min(start + timedelta(days=window_days), end)
+        windows.append((start.isoformat(), stop.isoformat()))
+        start = stop
+    return windows
+
+def window_filename(keyword, since, until):
+    safe_keyword = "".join(c if c.isalnum() else "_" for c in keyword)
+    return f"{safe_keyword}_{since}_{until}.csv"
+
+def tweet_harvest_command(filename, path, query, limit, token):
+    """
+    Harvester default: tweet-harvest lewat npx. tweet-harvest selalu menulis ke
+    tweets-data/<filename> di folder kerjanya, jadi proses dijalankan dari folder induk output_dir
+    (lihat harvester_cwd) supaya hasilnya tetap berada di `path`.
+    """
+    return scrap.build_command(filename, query, limit, token)
+
+def harvester_cwd(harvester, output_dir):
+    """Folder kerja proses harvester (None = folder kerja saat ini)"""
+    if harvester is not tweet_harvest_command: return None
+    if os.path.basename(os.path.normpath(output_dir)) != scrap.OUTPUT_DIR:
+        raise ValueError(f"tweet-harvest hanya bisa menulis ke folder bernama {scrap.OUTPUT_DIR}/, "
+                         f"bukan {output_dir} (atau pakai --harvester)")
+    return os.path.dirname(os.path.abspath(output_dir))
+
+def template_command(template):
+    """
+    Harvester dari template perintah, mis. untuk harvester palsu saat testing:
+    placeholder {filename}, {path}, {query}, {limit}, {token}
+    """
+    parts = shlex.split(template)
+
+    def command(filename, path, query, limit, token):
+        values = {'filename': filename, 'path': path, 'query': query, 'limit': limit, 'token': token}
+        return [part.format(**values) for part in parts]
+    return command
+
+# ==========================================
+# 3. CHECKPOINT
+# ==========================================
+
+class Checkpoint:
+    """Status per window (key = 'since_until'), disimpan atomik setiap ada window selesai"""
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.windows = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.windows = json.load(f)
+
+    def is_done(self, key):
+        # 'empty' (harvester sukses tapi tidak ada file hasil) dan 'failed' diulang di run berikutnya
+        return self.windows.get(key, {}).get('status') == 'done'
+
+    def mark(self, key, **info):
+        self.windows[key] = {**info, 'updated_at': datetime.now().isoformat(timespec='seconds')}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.windows, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+# ==========================================
+# 4. ORKESTRASI ASYNC
+# ==========================================
+
+async def _run_once(command, log_path, timeout, cwd=None):
+    """Satu percobaan: stdout/stderr ke file log per window supaya output proses tidak campur"""
+    with open(log_path, 'ab') as log:
+        proc = await asyncio.create_subprocess_exec(*command, stdout=log, stderr=asyncio.subprocess.STDOUT, cwd=cwd)
+        try:
+            return await asyncio.wait_for(proc.wait(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return None
+
+async def harvest_window(window, semaphore, checkpoint, harvester, keyword, limit, token,
+                         output_dir=OUTPUT_DIR, retries=RETRIES, backoff_base=BACKOFF_BASE, timeout=TIMEOUT):
+    since, until = window
+    key = f"{since}_{until}"
+    filename = window_filename(keyword, since, until)
+    path = os.path.join(output_dir, filename)
+    log_path = os.path.join(output_dir, "logs", filename.replace(".csv", ".log"))
+    command = harvester(filename, path, scrap.build_query(keyword, since, until), limit, token)
+    cwd = harvester_cwd(harvester, output_dir)
+
+    for attempt in range(1, retries + 2):
+        async with semaphore:
+            print(f"[{datetime.now():%H:%M:%S}] ⏳ {key} percobaan {attempt}")
+            start = time.perf_counter()
+            returncode = await _run_once(command, log_path, timeout, cwd)
+            elapsed = time.perf_counter() - start
+
+        if returncode == 0:
+            if not os.path.exists(path):
+                # Tanpa tweet di window itu tweet-harvest selesai tanpa membuat file, tapi bisa juga
+                # hasilnya tertulis di tempat lain; dicatat terpisah dari 'done' supaya diulang run berikutnya
+                checkpoint.mark(key, status='empty', path=None, rows=0, attempts=attempt, seconds=round(elapsed, 1))
+                print(f"[{datetime.now():%H:%M:%S}] ⚪ {key}: tidak ada file hasil di {path}, diulang di run berikutnya")
+                return True
+            rows = _count_rows(path)
+            checkpoint.mark(key, status='done', path=path, rows=rows, attempts=attempt, seconds=round(elapsed, 1))
+            print(f"[{datetime.now():%H:%M:%S}] ✅ {key}: {rows} tweet ({elapsed:.0f} detik)")
+            return True
+
+        reason = "timeout" if returncode is None else f"exit code {returncode}"
+        if attempt > retries:
+            checkpoint.mark(key, status='failed', error=reason, attempts=attempt)
+            print(f"[{datetime.now():%H:%M:%S}] ❌ {key} gagal ({reason}), lihat {log_path}")
+            return False
+
+        # Backoff eksponensial + jitter (di luar semaphore, slot dipakai window lain)
+        delay = backoff_base * 2 ** (attempt - 1) * (0.5 + random.random())
+        print(f"[{datetime.now():%H:%M:%S}] ⚠️ {key} {reason}, ulang dalam {delay:.0f} detik")
+        await asyncio.sleep(delay)
+
+def _count_rows(path):
+    import pandas as pd
+    return len(pd.read_csv(path, usecols=[0]))
+
+async def harvest_all(windows, harvester, keyword=KEYWORD, limit=LIMIT_PER_WINDOW, token="",
+                      concurrency=CONCURRENCY, checkpoint_file=CHECKPOINT_FILE, output_dir=OUTPUT_DIR,
+                      retries=RETRIES, backoff_base=BACKOFF_BASE, timeout=TIMEOUT):
+    os.makedirs(os.path.join(output_dir, "logs"), exist_ok=True)
+    checkpoint = Checkpoint(checkpoint_file)
+    pending = [w for w in windows if not checkpoint.is_done(f"{w[0]}_{w[1]}")]
+    print(f"🗓️ {len(windows)} window, {len(windows) - len(pending)} sudah selesai (checkpoint), "
+          f"{len(pending)} dijalankan dengan {concurrency} proses paralel")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*[
+        harvest_window(window, semaphore, checkpoint, harvester, keyword, limit, token,
+                       output_dir, retries, backoff_base, timeout)
+        for window in pending
+    ])
+    return checkpoint, sum(not ok for ok in results)
+
+# ==========================================
+# 5. GABUNG HASIL
+# ==========================================
+
+def merge_outputs(checkpoint, windows, merged_file=MERGED_FILE):
+    """Gabung CSV semua window yang selesai jadi satu file raw, tweet yang sama hanya disimpan sekali"""
+    import pandas as pd
+    from tweet_key import tweet_key
+    from storage import STRING_COLUMNS, save_table
+
+    frames = []
+    for since, until in windows:
+        info = checkpoint.windows.get(f"{since}_{until}", {})
+        if info.get('status') == 'done' and info.get('path') and os.path.exists(info['path']):
+            frames.append(pd.read_csv(info['path'], dtype={col: str for col in STRING_COLUMNS}))
+    if not frames:
+        print("⚠️ Tidak ada hasil untuk digabung.")
+        return None
+
+    df = pd.concat(frames, ignore_index=True)
+    total = len(df)
+    # Window bisa overlap di batas hari / hasil retry, dedupe pakai id dari tweet_url
+    keys = pd.Series([tweet_key(row) for row in df.to_dict('records')], index=df.index)
+    df = df[~keys.duplicated(keep='first')]
+    save_table(df, merged_file)
+    print(f"💾 {len(df)} tweet unik ({total - len(df)} duplikat dibuang) disimpan di: {merged_file}")
+    return df
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Scraping paralel per window tanggal dengan tweet-harvest")
+    parser.add_argument('--keyword', default=KEYWORD)
+    parser.add_argument('--since', default=SINCE_DATE)
+    parser.add_argument('--until', default=UNTIL_DATE)
+    parser.add_argument('--window-days', type=int, default=WINDOW_DAYS)
+    parser.add_argument('--limit', type=int, default=LIMIT_PER_WINDOW, help="Batas tweet per window")
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    parser.add_argument('--retries', type=int, default=RETRIES)
+    parser.add_argument('--backoff', type=float, default=BACKOFF_BASE, help="Backoff awal (detik)")
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help="Batas waktu per window (detik)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE)
+    parser.add_argument('--merged', default=MERGED_FILE, help="File gabungan (.csv / .parquet)")
+    parser.add_argument('--harvester', default=None,
+                        help="Template perintah pengganti tweet-harvest, placeholder {filename} {path} {query} {limit} {token}")
+    args = parser.parse_args()
+
+    token = os.environ.get(TOKEN_ENV, scrap.auth_token)
+    harvester = template_command(args.harvester) if args.harvester else tweet_harvest_command
+    try:
+        harvester_cwd(harvester, args.output_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    windows = make_windows(args.since, args.until, args.window_days)
+
+    checkpoint, failed = asyncio.run(harvest_all(
+        windows, harvester, args.keyword, args.limit, token, args.concurrency,
+        args.checkpoint, args.output_dir, args.retries, args.backoff, args.timeout,
+    ))
+    merge_outputs(checkpoint, windows, args.merged)
+    if failed:
+        print(f"⚠️ {failed} window gagal; jalankan ulang perintah yang sama untuk mencoba lagi window tersebut.")
@@ -1,119 +1,117 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+import numpy as np
+from itertools import repeat
+from phrase_matcher import PhraseMatcher
+from term_counts import TermCounts
+import lexicon_store
+from metrics import metrics
+
+# pandas, Sastrawi, matplotlib & WordCloud sengaja di-import saat dibutuhkan saja,
+# supaya `import sentimen` + get_sentiment() untuk satu teks tetap cepat
 
 # ==========================================
-# 1. KONFIGURASI & LOAD DATA
+# 1. KONFIGURASI
 # ==========================================
 file_input = "data_final.csv" 
-df = pd.read_csv(file_input)
-
 text_col = 'processed_text' 
-df[text_col] = df[text_col].fillna('').astype(str)
+output_csv = "hasil_sentimen_final.csv"
+
+# Laporan kata teratas per label & batas kata per WordCloud
+TOP_TERMS_FILE = "kata_teratas_per_label.csv"
+TOP_N_TERMS = 30
+WORDCLOUD_MAX_WORDS = 200
+
+# Pemisah antar dokumen saat satu batch digabung jadi satu string (score_batch).
+# Tidak ada frasa/kata lexicon yang mengandung \x00, jadi frasa tidak bisa melewati pemisah
+DOC_SEP = "\x00"
 
 # ==========================================
-# 2. PERSIAPAN KAMUS (STEMMING OTOMATIS)
+# 2. DEFINISI KAMUS (FILE EKSTERNAL)
 # ==========================================
-print("Menyiapkan kamus dan melakukan stemming...")
-
-# Init Sastrawi
-factory = StemmerFactory()
-stemmer = factory.create_stemmer()
-
-# A. DEFINISI FRASA (N-GRAM)
-# Penting: Frasa ini harus diproses (stem + stopword removal) agar cocok dengan data
-positive_phrases_raw = [
-    "bebas dari keracunan", "bebas dari basi", "bebas dari korupsi",
-    "tidak ada racun", "tidak basi", "sangat layak", "jauh dari kata basi",
-    "kerja nyata", "sangat membantu"
-]
-
-negative_phrases_raw = [
-    "kurang gizi", "tidak layak", "tidak enak", "tidak higienis", 
-    "banyak lalat", "ada ulat", "bau anyep", "rasa hambar"
-]
-
-# Fungsi helper untuk menyamakan format frasa dengan data
-def preprocess_match_key(text):
-    # Lakukan stemming sederhana pada frasa
-    # (Asumsi stopword sudah hilang di data, jadi kita ambil kata kuncinya saja)
-    return stemmer.stem(text)
-
-pos_phrases = [preprocess_match_key(p) for p in positive_phrases_raw]
-neg_phrases = [preprocess_match_key(p) for p in negative_phrases_raw]
-
-# B. DEFINISI KAMUS KATA (LEXICON)
-pos_words_raw = [
-    "sehat", "anak bangsa", "nutrisi",
-    "mantap", "hebat", "dukung", "terima kasih", "lanjut", "gas", 
-    "semangat", "optimis", "maju", "bangkit", "sejahtera", "makmur", 
-    "berkah", "amanah", "nyata", "bukti", "komitmen", "solusi", 
-    "terbantu", "menolong", "apresiasi", "salut", "best", "cinta", 
-    "kenyang", "lezat", "sedap", "higienis", "bersih", "hangat", 
-    "fresh", "segar", "lengkap", "mutu", "terjamin", "cerdas", 
-    "pintar", "tumbuh", "kembang", "generasi", "emas", "penerus",
-    "manfaat", "harapan", "memastikan", "merata", "berkualitas", 
-    "mandiri", "berhasil", "kolaborasi", "sempurna", "ketahanan", 
-    "bahagia", "meningkatkan", "terbaik", "pemerataan", "mendukung", 
-    "menjamin", "strategis", "membangun", "unggul", "sukses"
-]
-
-neg_words_raw = [
-    "basih", "ulatan", "keracun", "bushi", "ancur", "ilangg", 
-    "badut", "dagelan", "wacana", "omdo", "pencitraan", "drama", 
-    "lawak", "ngelawak", "topeng",
-    "basi", "asam", "kecut", "bau", "anyep", "dingin", "keras", "alot", "mentah",
-    "hambar", "kurang", "dikit", "sedikit", "pelit", "jelek", "buruk", "parah",
-    "kotor", "jorok", "rambut", "lalat", "ulat", "belatung", "benda", "asing",
-    "mual", "muntah", "sakit", "diare", "keracunan", "racun", "bahaya", "ngeri",
-    "seram", "takut", "sampah", "plastik", "limbah", "kardus", "styrofoam", 
-    "ompreng", "ngapain", "cape", "anjir", "modus", "waste", "kelaparan", "arogan", 
-    "kroni", "rugi", "taik", "membahayakan", "bangsat", "mahal", "anjing", 
-    "basah", "kocak", "masalah", "kasus", "gila", "bancakan", "sianida", 
-    "menentang", "becus", "geng", "akalan", "keuntungan", "ketakutan", 
-    "benerin", "hadeuh", "sumpah", "gak jelas", "gajelas", "harusnya",
-    "korupsi", "maling", "tikus", "rampok", "garong", "sunat", "potong", "tilap",
-    "anggaran", "dana", "duit", "uang", "pajak", "rakyat", "beban", "utang", "hutang",
-    "bengkak", "boros", "hambur", "buang", "sia-sia", "percuma", "gagal", 
-    "bohong", "palsu", "kampanye", "politik", "kepentingan",
-    "bisnis", "cuan", "proyek", "tender", "bagi-bagi", "jatah", "oligarki", "kronik",
-    "nepotisme", "keluarga", "dinasti", "impor", "asing", "swasta", "kapitalis",
-    "kecewa", "sedih", "marah", "kesal", "benci", "muak", "lelah", "stres",
-    "pusing", "bingung", "ribet", "susah", "sulit", "kacau", "rusak", "hancur",
-    "antri", "lama", "lelet", "lambat", "telat", "batal", "stop", "hentikan",
-    "tolak", "ganti", "hapus", "tarik", "aneh", "lucu", "suram", "bodoh", 
-    "goblok", "tolol", "dungu", "mematikan", "merugikan", "korban", "tumbal"
-]
-
-# Stemming lexicon agar cocok dengan processed_text
-# Gunakan set agar pencarian lebih cepat dan unik
-pos_set = set([stemmer.stem(word) for word in pos_words_raw])
-neg_set = set([stemmer.stem(word) for word in neg_words_raw])
-
-print("Stemming lexicon selesai.")
+# Frasa & kata positif/negatif (mentah, belum di-stem) ada di lexicon.json, lihat lexicon_store.py.
+# Stemming & automaton frasa di-compile sekali per versi kamus dan bisa di-reload saat service jalan.
+# Nama lama (positive_phrases_raw, pos_words_raw, ...) tetap bisa dibaca lewat __getattr__ di bawah.
+
+_RAW_SECTIONS = {
+    'positive_phrases_raw': 'positive_phrases', 'negative_phrases_raw': 'negative_phrases',
+    'pos_words_raw': 'positive_words', 'neg_words_raw': 'negative_words',
+}
 
 # ==========================================
-# 3. FUNGSI SENTIMEN
+# 3. PERSIAPAN KAMUS (STEMMING OTOMATIS, LAZY)
 # ==========================================
 
+class Lexicon:
+    """Lexicon yang sudah di-stem beserta struktur pencariannya (frasa & kata)"""
+
+    def __init__(self, pos_phrases, neg_phrases, pos_set, neg_set, phrase_matcher=None):
+        self.pos_phrases = pos_phrases
+        self.neg_phrases = neg_phrases
+        self.pos_set = pos_set
+        self.neg_set = neg_set
+
+        # Semua frasa dikompilasi jadi satu automaton (Aho-Corasick),
+        # urutan prioritas tetap: frasa positif dulu, lalu negatif
+        self.phrase_matcher = phrase_matcher or PhraseMatcher(pos_phrases + neg_phrases)
+        self.phrase_weights = [2 if p in pos_phrases else -2 for p in self.phrase_matcher.phrases]
+
+        # Kamus kata -> id integer untuk scoring batch.
+        # Kata yang ada di kedua set dihitung positif, sama seperti urutan if/elif di get_sentiment
+        self.term_index = {word: i for i, word in enumerate(sorted(pos_set | neg_set))}
+        self.term_is_pos = np.array([word in pos_set for word in self.term_index], dtype=bool)
+        # Id tambahan untuk token pemisah dokumen
+        self.sep_id = len(self.term_index)
+        self.token_ids = dict(self.term_index)
+        self.token_ids[DOC_SEP] = self.sep_id
+
+def load_lexicon(compiled=None):
+    """Lexicon dari satu versi kamus hasil compile (default: versi aktif, artifact per hash isi lexicon.json)"""
+    compiled = compiled or lexicon_store.get_compiled()
+    return Lexicon(compiled.pos_phrases, compiled.neg_phrases, compiled.pos_set, compiled.neg_set,
+                   compiled.phrase_matcher)
+
+def build_lexicon_artifact():
+    """Paksa cek ulang lexicon.json & pastikan artifact-nya ada"""
+    lexicon_store.store.reload(force=True)
+    return lexicon_store.artifact_path(lexicon_store.get_compiled().hash, lexicon_store.store.artifact_dir)
+
+# (versi kamus, Lexicon): Lexicon dibangun ulang hanya saat versi kamus di store berganti
+_lexicon = None
+
+def get_lexicon():
+    """Lexicon versi aktif; setelah reload di store, pemanggilan berikutnya otomatis memakai versi baru"""
+    global _lexicon
+    compiled = lexicon_store.get_compiled()
+    cached = _lexicon
+    if cached is None or cached[0] is not compiled:
+        cached = (compiled, load_lexicon(compiled))
+        _lexicon = cached
+    return cached[1]
+
+def __getattr__(name):
+    # Kompatibilitas: sentimen.pos_set, sentimen.phrase_matcher, dst. tetap bisa diakses
+    if name in ('pos_phrases', 'neg_phrases', 'pos_set', 'neg_set', 'phrase_matcher', 'phrase_weights'):
+        return getattr(get_lexicon(), name)
+    if name in _RAW_SECTIONS:
+        return lexicon_store.read_source(lexicon_store.store.path)[_RAW_SECTIONS[name]]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ==========================================
+# 4. FUNGSI SENTIMEN
+# ==========================================
+
+def score_phrases(text, lexicon=None):
+    """Skor frasa (+2/-2, sekali per frasa) dan teks sisa setelah frasa dihapus"""
+    lexicon = lexicon or get_lexicon()
+    found, temp_text = lexicon.phrase_matcher.remove_matches(text)
+    return sum(lexicon.phrase_weights[phrase_id] for phrase_id in found), temp_text
+
 def get_sentiment(text):
     if not text: return 'Netral'
+    lexicon = get_lexicon()
+    pos_set, neg_set = lexicon.pos_set, lexicon.neg_set
     
-    score = 0
-    temp_text = text
-    
-    # 1. Cek N-gram / Frasa (Prioritas Tinggi)
-    for phrase in pos_phrases:
-        if phrase in temp_text:
-            score += 2
-            temp_text = temp_text.replace(phrase, "") # Hapus agar tidak double count
-            
-    for phrase in neg_phrases:
-        if phrase in temp_text:
-            score -= 2
-            temp_text = temp_text.replace(phrase, "")
+    # 1. Cek N-gram / Frasa (Prioritas Tinggi), satu kali jalan lewat automaton
+    score, temp_text = score_phrases(text, lexicon)
             
     # 2. Cek Kata per Kata (Lexicon)
     words = temp_text.split()
@@ -143,39 +141,93 @@ def get_sentiment(text):
         
     return label
 
-# Terapkan fungsi
-print("Sedang melakukan scoring sentimen...")
-df['label_pred'] = df[text_col].apply(get_sentiment)
+def _as_text_list(texts):
+    """Samakan input (Series / list) jadi list string, NaN/None -> ''"""
+    if hasattr(texts, 'fillna'):
+        return texts.fillna('').astype(str).tolist()
+    return ['' if t is None or t != t else str(t) for t in texts]
 
-# Simpan hasil
-output_csv = "hasil_sentimen_final.csv"
-df.to_csv(output_csv, index=False)
-print(f"Hasil disimpan di: {output_csv}")
-print(df['label_pred'].value_counts())
+def score_batch(texts, term_counts=None):
+    """
+    Scoring sentimen untuk banyak teks sekaligus (hasil sama dengan get_sentiment).
+    Mengembalikan dict berisi array: score, label, n_pos, n_neg.
+    term_counts (TermCounts, opsional) ikut diisi frekuensi kata per label batch ini.
+    """
+    lexicon = get_lexicon()
+    texts = _as_text_list(texts)
+    n_docs = len(texts)
+    joiner = f" {DOC_SEP} "
+    joined = joiner.join(texts)
+    if joined.count(DOC_SEP) != max(n_docs - 1, 0):
+        texts = [text.replace(DOC_SEP, " ") for text in texts]
+        joined = joiner.join(texts)
+    source_joined = joined
+    
+    # 1. Frasa: satu kali scan untuk seluruh batch, lalu hanya dokumen yang kena yang diproses ulang
+    phrase_score = np.zeros(n_docs, dtype=np.int64)
+    if len(lexicon.phrase_matcher) and n_docs:
+        matches = lexicon.phrase_matcher.find_all(joined)
+        if matches:
+            lengths = np.fromiter(map(len, texts), dtype=np.int64, count=n_docs)
+            doc_starts = np.concatenate(([0], np.cumsum(lengths[:-1] + len(joiner))))
+            match_starts = np.fromiter((start for start, _, _ in matches), dtype=np.int64, count=len(matches))
+            for i in np.unique(np.searchsorted(doc_starts, match_starts, side='right') - 1):
+                phrase_score[i], texts[i] = score_phrases(texts[i], lexicon)
+            joined = joiner.join(texts)
+    
+    # 2. Tokenisasi sekali untuk seluruh batch, token -> id lexicon (-1 = bukan kata lexicon).
+    #    Token pemisah menandai batas dokumen, sisanya jadi pasangan dokumen-term (format sparse COO)
+    tokens = joined.split()
+    term_ids = np.fromiter(map(lexicon.token_ids.get, tokens, repeat(-1)), dtype=np.int64, count=len(tokens))
+    is_sep = term_ids == lexicon.sep_id
+    doc_ids = np.cumsum(is_sep)
+    in_lexicon = (term_ids >= 0) & ~is_sep
+    doc_ids, term_ids = doc_ids[in_lexicon], term_ids[in_lexicon]
+    term_is_pos = lexicon.term_is_pos
+    
+    n_pos = np.bincount(doc_ids[term_is_pos[term_ids]], minlength=n_docs)
+    n_neg = np.bincount(doc_ids[~term_is_pos[term_ids]], minlength=n_docs)
+    score = phrase_score + n_pos - n_neg
+    
+    # 3. Logika Tie-Breaker (Jika skor 0), sama dengan get_sentiment
+    tie_label = np.where(n_neg > 0, 'Negatif', np.where(n_pos > 0, 'Positif', 'Netral'))
+    label = np.where(score > 0, 'Positif', np.where(score < 0, 'Negatif', tie_label)).astype(object)
+    
+    # 4. Frekuensi kata per label dari teks asli (sebelum frasa dihapus), token dipakai ulang bila sama
+    if term_counts is not None and n_docs:
+        term_counts.add_joined(tokens if joined is source_joined else source_joined.split(), label, DOC_SEP)
+    
+    return {'score': score, 'label': label, 'n_pos': n_pos, 'n_neg': n_neg}
 
 # ==========================================
-# 4. VISUALISASI
+# 5. VISUALISASI
 # ==========================================
 
-# A. PIE CHART
-plt.figure(figsize=(7, 7))
-counts = df['label_pred'].value_counts()
-colors = {'Positif': '#66b3ff', 'Negatif': '#ff9999', 'Netral': '#99ff99'}
-plt.pie(counts, labels=counts.index, autopct='%1.1f%%', 
-        colors=[colors.get(x, '#cccccc') for x in counts.index], 
-        startangle=90, shadow=True)
-plt.title('Distribusi Sentimen (Data Final)')
-plt.savefig('grafik_lingkaran_sentimen.png')
-plt.show()
-
-# B. WORDCLOUD
-def generate_wordcloud(sentiment, colormap):
-    text = " ".join(df[df['label_pred'] == sentiment][text_col])
-    if not text.strip():
+def plot_pie(df):
+    import matplotlib.pyplot as plt
+    
+    plt.figure(figsize=(7, 7))
+    counts = df['label_pred'].value_counts()
+    colors = {'Positif': '#66b3ff', 'Negatif': '#ff9999', 'Netral': '#99ff99'}
+    plt.pie(counts, labels=counts.index, autopct='%1.1f%%', 
+            colors=[colors.get(x, '#cccccc') for x in counts.index], 
+            startangle=90, shadow=True)
+    plt.title('Distribusi Sentimen (Data Final)')
+    plt.savefig('grafik_lingkaran_sentimen.png')
+    plt.show()
+
+def generate_wordcloud(term_counts, sentiment, colormap):
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
+    
+    # Frekuensi sudah dihitung saat scoring, WordCloud tidak perlu tokenisasi ulang
+    frequencies = dict(term_counts.top_terms(sentiment, WORDCLOUD_MAX_WORDS))
+    if not frequencies:
         print(f"Tidak ada kata untuk sentimen {sentiment}")
         return
         
-    wc = WordCloud(width=800, height=400, background_color='white', colormap=colormap).generate(text)
+    wc = WordCloud(width=800, height=400, background_color='white', colormap=colormap,
+                   max_words=WORDCLOUD_MAX_WORDS).generate_from_frequencies(frequencies)
     
     plt.figure(figsize=(10, 5))
     plt.imshow(wc, interpolation='bilinear')
@@ -184,9 +236,78 @@ def generate_wordcloud(sentiment, colormap):
     plt.savefig(f'wordcloud_{sentiment.lower()}.png')
     plt.show()
 
-# Generate untuk Positif dan Negatif
-generate_wordcloud('Positif', 'Greens')
-generate_wordcloud('Negatif', 'Reds')
+def save_top_terms(term_counts, output_file=TOP_TERMS_FILE, n=TOP_N_TERMS):
+    import pandas as pd
+    
+    report = pd.DataFrame(term_counts.report(n), columns=['label', 'rank', 'term', 'count'])
+    report.to_csv(output_file, index=False, encoding='utf-8')
+    for label, group in report.groupby('label', sort=False):
+        print(f"{label}: " + ", ".join(f"{t} ({c})" for t, c in zip(group['term'][:10], group['count'][:10])))
+    print(f"Kata teratas per label disimpan di: {output_file}")
 
+# ==========================================
+# 6. EKSEKUSI UTAMA
+# ==========================================
 
-print("Visualisasi selesai dan disimpan.")
+def main(input_file=file_input, output_file=output_csv, narrow=False):
+    # Input/output boleh .csv atau .parquet (lihat storage.py).
+    # Output berisi semua kolom input + label_pred; narrow=True -> hanya baca & simpan
+    # kolom yang dipakai (proyeksi kolom): teks & label asli bila ada
+    from storage import load_table, save_table
+    
+    with metrics.stage('load') as stage:
+        df = load_table(input_file, columns=[text_col, 'label'] if narrow else None)
+        df[text_col] = df[text_col].fillna('').astype(str)
+        stage.add_rows(len(df))
+    metrics.count('rows_in', len(df))
+    
+    with metrics.stage('lexicon'):
+        get_lexicon()
+    
+    # Terapkan fungsi
+    print("Sedang melakukan scoring sentimen...")
+    term_counts = TermCounts()
+    with metrics.stage('score_batch', rows=len(df)):
+        df['label_pred'] = score_batch(df[text_col], term_counts=term_counts)['label']
+    for label, count in df['label_pred'].value_counts().items():
+        metrics.count(f'label_{label}', int(count))
+    
+    # Simpan hasil
+    with metrics.stage('save', rows=len(df)):
+        save_table(df, output_file)
+    metrics.count('rows_out', len(df))
+    print(f"Hasil disimpan di: {output_file}")
+    print(df['label_pred'].value_counts())
+    
+    # A. PIE CHART
+    with metrics.stage('plot_pie'):
+        plot_pie(df)
+    
+    # B. WORDCLOUD
+    # Generate untuk Positif dan Negatif
+    with metrics.stage('wordcloud'):
+        generate_wordcloud(term_counts, 'Positif', 'Greens')
+        generate_wordcloud(term_counts, 'Negatif', 'Reds')
+    
+    # C. KATA TERATAS PER LABEL
+    with metrics.stage('top_terms'):
+        save_top_terms(term_counts)
+    
+    print("Visualisasi selesai dan disimpan.")
+
+if __name__ == "__main__":
+    import argparse
+    from metrics import add_arguments as add_metrics_arguments, enable_from_args as enable_metrics
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--build-lexicon', action='store_true', help="Hanya compile lexicon.json ke artifact")
+    parser.add_argument('--input', default=file_input, help="File input (.csv / .parquet)")
+    parser.add_argument('--output', default=output_csv, help="File output (.csv / .parquet)")
+    parser.add_argument('--narrow', action='store_true', help="Output hanya processed_text, label & label_pred")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    enable_metrics(args)
+    
+    if args.build_lexicon:
+        print(f"Lexicon disimpan di: {build_lexicon_artifact()}")
+    else:
+        main(args.input, args.output, narrow=args.narrow)
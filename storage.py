@@ -0,0 +1,169 @@
+import os
+import pandas as pd
+
+# ==========================================
+# PENYIMPANAN ARTIFACT PIPELINE (CSV / PARQUET)
+# ==========================================
+# Format dipilih dari ekstensi file: .parquet -> Parquet (Arrow), selain itu CSV.
+# Parquet butuh pyarrow (pip install pyarrow); CSV tetap bisa dipakai tanpa pyarrow.
+
+# Kolom hitungan engagement (di CSV sering terbaca sebagai float/string) & statistik teks
+COUNT_COLUMNS = ['favorite_count', 'retweet_count', 'reply_count', 'quote_count']
+INT_COLUMNS = COUNT_COLUMNS + ['text_length', 'word_count', 'has_image', 'cluster_id']
+
+# Kolom skor (audit near-duplicate, confidence IndoBERT)
+FLOAT_COLUMNS = ['similarity', 'confidence_bert']
+
+# Kolom dengan nilai berulang sedikit -> dictionary encoding (kategori di pandas)
+DICTIONARY_COLUMNS = ['label', 'label_pred', 'lang']
+
+# Skema default = artifact data tweet. Artifact lain (mis. state agregat di aggregate.py) memberi
+# skemanya sendiri lewat argumen `schema`, supaya nama kolomnya tidak ikut memaksa tipe artifact tweet.
+TWEET_SCHEMA = {'int': INT_COLUMNS, 'float': FLOAT_COLUMNS, 'dictionary': DICTIONARY_COLUMNS}
+
+# Kolom id harus tetap string (kalau jadi float, id tweet rusak jadi 1.9873e+18)
+STRING_COLUMNS = [
+    'conversation_id_str', 'id_str', 'user_id_str', 'created_at', 'full_text',
+    'image_url', 'in_reply_to_screen_name', 'location', 'tweet_url', 'username',
+    'cleaned_text', 'processed_text',
+]
+
+def is_parquet(path):
+    return str(path).lower().endswith(('.parquet', '.pq'))
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Format Parquet butuh pyarrow: pip install pyarrow")
+    return pa, pq
+
+def schema_for(columns, schema=None):
+    """Skema Arrow eksplisit untuk kolom yang dikenal, kolom lain dibiarkan string"""
+    pa, _ = _pyarrow()
+    schema = schema or TWEET_SCHEMA
+    fields = []
+    for col in columns:
+        if col in schema.get('int', ()):
+            fields.append(pa.field(col, pa.int64()))
+        elif col in schema.get('float', ()):
+            fields.append(pa.field(col, pa.float64()))
+        elif col in schema.get('dictionary', ()):
+            fields.append(pa.field(col, pa.dictionary(pa.int16(), pa.string())))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+def conform(df, schema=None):
+    """Samakan tipe kolom dengan skema (angka engagement jadi int, skor jadi float, label jadi kategori)"""
+    schema = schema or TWEET_SCHEMA
+    df = df.copy()
+    for col in df.columns:
+        if col in schema.get('int', ()):
+            if not pd.api.types.is_integer_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int64')
+        elif col in schema.get('float', ()):
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        elif col in schema.get('dictionary', ()):
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('string').astype('category')
+        elif not (pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col])):
+            # Kolom kosong semua / angka yang bukan kolom hitungan tetap disimpan sebagai string
+            df[col] = df[col].astype('string')
+    return df
+
+def _csv_dtypes():
+    return {col: str for col in STRING_COLUMNS}
+
+def _select(columns):
+    # Kolom yang tidak ada di file diabaikan (mis. 'label' pada data tanpa label)
+    return None if columns is None else (lambda col: col in columns)
+
+def load_table(path, columns=None):
+    """Baca artifact; `columns` = proyeksi kolom (hanya kolom itu yang dibaca dari disk)"""
+    if is_parquet(path):
+        _, pq = _pyarrow()
+        if columns is not None:
+            available = pq.read_schema(path).names
+            columns = [col for col in columns if col in available]
+        return pq.read_table(path, columns=columns).to_pandas()
+
+    return pd.read_csv(path, usecols=_select(columns), dtype=_csv_dtypes())
+
+def iter_table(path, chunksize, columns=None):
+    """Baca artifact per potongan (untuk mode streaming)"""
+    if is_parquet(path):
+        _, pq = _pyarrow()
+        parquet_file = pq.ParquetFile(path)
+        if columns is not None:
+            columns = [col for col in columns if col in parquet_file.schema_arrow.names]
+        start = 0
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            chunk = batch.to_pandas()
+            # Index berlanjut antar potongan, sama seperti read_csv(chunksize=...)
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+        return
+
+    yield from pd.read_csv(path, chunksize=chunksize, usecols=_select(columns), dtype=_csv_dtypes())
+
+def save_table(df, path, schema=None):
+    """
+    Simpan artifact sesuai ekstensi; Parquet memakai skema eksplisit + kompresi zstd.
+    `schema` = dict {'int': [...], 'float': [...], 'dictionary': [...]}, default TWEET_SCHEMA.
+    """
+    if is_parquet(path):
+        pa, pq = _pyarrow()
+        df = conform(df, schema)
+        table = pa.Table.from_pandas(df, schema=schema_for(df.columns, schema), preserve_index=False)
+        pq.write_table(table, path, compression='zstd')
+    else:
+        df.to_csv(path, index=False, encoding='utf-8')
+
+class TableWriter:
+    """Tulis artifact potongan demi potongan (CSV atau Parquet) tanpa menyimpan semuanya di memori"""
+
+    def __init__(self, path, schema=None):
+        self.path = path
+        self.schema = schema
+        self.parquet = is_parquet(path)
+        self._writer = None
+        self._file = None
+
+    def __enter__(self):
+        if not self.parquet:
+            self._file = open(self.path, 'w', encoding='utf-8', newline='')
+        return self
+
+    def write(self, df):
+        if self.parquet:
+            pa, pq = _pyarrow()
+            df = conform(df, self.schema)
+            schema = schema_for(df.columns, self.schema)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, schema, compression='zstd')
+            self._writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+        else:
+            df.to_csv(self._file, header=self._file.tell() == 0, index=False)
+
+    def __exit__(self, *exc):
+        if self._writer is not None: self._writer.close()
+        if self._file is not None: self._file.close()
+
+def export_csv(src, dst, columns=None):
+    """Ekspor artifact (mis. Parquet) ke CSV"""
+    save_table(load_table(src, columns=columns), dst)
+    return dst
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Konversi artifact pipeline antara CSV dan Parquet")
+    parser.add_argument('src')
+    parser.add_argument('dst')
+    parser.add_argument('--columns', nargs='*', help="Hanya kolom ini yang disalin")
+    args = parser.parse_args()
+
+    save_table(load_table(args.src, columns=args.columns), args.dst)
+    print(f"Disimpan: {args.dst} ({os.path.getsize(args.dst)} byte)")
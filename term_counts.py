@@ -0,0 +1,85 @@
+import numpy as np
+
+# ==========================================
+# FREKUENSI KATA PER LABEL (STREAMING)
+# ==========================================
+# Diisi batch demi batch saat scoring (sentimen.score_batch(..., term_counts=...)), jadi WordCloud
+# dan laporan kata teratas cukup memakai tabel seukuran kosakata, bukan satu string raksasa per label.
+
+class TermCounts:
+    """Tabel hitungan (label x kosakata) berbasis array numpy, kosakata bertambah tiap batch"""
+
+    def __init__(self, labels=('Positif', 'Netral', 'Negatif')):
+        self.labels = list(labels)
+        self.label_index = {label: i for i, label in enumerate(self.labels)}
+        self.vocab = {}
+        self.terms = []
+        self.counts = np.zeros((len(self.labels), 1024), dtype=np.int64)
+
+    def _ensure_capacity(self, size):
+        if size <= self.counts.shape[1]: return
+        grown = np.zeros((len(self.labels), max(size, 2 * self.counts.shape[1])), dtype=np.int64)
+        grown[:, :self.counts.shape[1]] = self.counts
+        self.counts = grown
+
+    def _term_ids(self, tokens):
+        vocab, terms = self.vocab, self.terms
+        ids = np.empty(len(tokens), dtype=np.int64)
+        for i, token in enumerate(tokens):
+            term_id = vocab.get(token)
+            if term_id is None:
+                term_id = vocab[token] = len(terms)
+                terms.append(token)
+            ids[i] = term_id
+        return ids
+
+    def _label_ids(self, labels):
+        return np.fromiter((self.label_index.setdefault(label, len(self.label_index)) for label in labels),
+                           dtype=np.int64, count=len(labels))
+
+    def add_joined(self, tokens, labels, separator):
+        """
+        Token satu batch yang dokumennya dipisah token `separator` (seperti di score_batch);
+        labels = label tiap dokumen, urut sesuai dokumen di batch. Pemisah tidak ikut dihitung.
+        """
+        # Posisi pemisah dicari sebelum _term_ids supaya pemisah tidak masuk kosakata
+        is_sep = np.fromiter((token == separator for token in tokens), dtype=bool, count=len(tokens))
+        doc_ids = np.cumsum(is_sep)[~is_sep]
+        ids = self._term_ids([token for token in tokens if token != separator])
+        self._add(self._label_ids(labels)[doc_ids], ids)
+
+    def add(self, texts, labels):
+        """Teks (sudah di-preprocess, dipisah spasi) beserta labelnya"""
+        token_lists = [text.split() for text in texts]
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        ids = self._term_ids([token for tokens in token_lists for token in tokens])
+        self._add(np.repeat(self._label_ids(labels), lengths), ids)
+
+    def _add(self, label_ids, term_ids):
+        if len(self.label_index) > len(self.labels):
+            self.labels = list(self.label_index)
+            extra = np.zeros((len(self.labels) - len(self.counts), self.counts.shape[1]), dtype=np.int64)
+            self.counts = np.vstack([self.counts, extra])
+        self._ensure_capacity(len(self.terms))
+        width = self.counts.shape[1]
+        flat = np.bincount(label_ids * width + term_ids, minlength=len(self.labels) * width)
+        self.counts += flat.reshape(len(self.labels), width)
+
+    def frequencies(self, label):
+        """dict kata -> jumlah untuk satu label (hanya kata yang muncul)"""
+        return dict(self.top_terms(label, None))
+
+    def top_terms(self, label, n=20):
+        """[(kata, jumlah), ...] terurut dari yang paling sering; n=None -> semua"""
+        if label not in self.label_index: return []
+        row = self.counts[self.label_index[label], :len(self.terms)]
+        nonzero = np.flatnonzero(row)
+        # Jumlah menurun, seri diurutkan sesuai urutan kata pertama kali muncul (stabil antar run)
+        order = nonzero[np.lexsort((nonzero, -row[nonzero]))][:n]
+        return [(self.terms[i], int(row[i])) for i in order.tolist()]
+
+    def report(self, n=20):
+        """Baris laporan kata teratas per label: (label, rank, term, count)"""
+        return [(label, rank, term, count)
+                for label in self.labels
+                for rank, (term, count) in enumerate(self.top_terms(label, n), start=1)]
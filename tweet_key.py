@@ -0,0 +1,25 @@
+import re
+import hashlib
+
+# ==========================================
+# KEY UNIK TWEET
+# ==========================================
+# Dipakai incremental.py (manifest) dan scrape_orchestrator.py (dedupe hasil gabungan).
+# Sengaja modul kecil tanpa dependensi berat supaya bisa diimpor tanpa memuat pipeline NLP.
+
+# id_str di CSV hasil scraping sering rusak jadi notasi ilmiah (1.9873e+18),
+# jadi id asli diambil dari tweet_url bila ada; kalau tidak ada juga, pakai hash isi tweet
+_status_id = re.compile(r'/status/(\d+)')
+CONTENT_KEY_COLUMNS = ['full_text', 'created_at', 'username']
+
+def tweet_key(row):
+    """
+    Key unik tweet: id dari tweet_url, lalu id_str bila masih utuh (angka saja),
+    kalau tidak hash isi tweet (full_text + created_at + username)
+    """
+    match = _status_id.search(str(row.get('tweet_url', '')))
+    if match: return match.group(1)
+    id_str = str(row.get('id_str', '')).strip()
+    if id_str.isdigit(): return id_str
+    content = "\x00".join(str(row.get(col, '')) for col in CONTENT_KEY_COLUMNS)
+    return "h" + hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()